@@ -0,0 +1,5 @@
+"""Path queries on the flow networks of task 1."""
+
+from .paths import FlowGraph, bottleneck, widest_cheapest_path, widest_cheapest_paths, widest_path, widest_paths
+
+__all__ = ["FlowGraph", "bottleneck", "widest_path", "widest_paths", "widest_cheapest_path", "widest_cheapest_paths"]
@@ -0,0 +1,263 @@
+"""Widest paths and cheapest widest paths on flow networks compiled to arrays."""
+
+from __future__ import annotations
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Hashable, Iterable, List, Sequence, Tuple
+import networkx as nx
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import breadth_first_order, dijkstra
+
+NO_PREDECESSOR = -9999
+"""How scipy.sparse.csgraph marks nodes without predecessor."""
+
+
+@dataclass(frozen=True)
+class FlowGraph:
+    """
+    A directed graph as compressed sparse row arrays.
+
+    The edges leaving node i are the entries ``offsets[i]`` up to ``offsets[i + 1]`` of
+    ``targets``, ``capacities`` and ``costs``. Nodes are addressed by their position in ``nodes``.
+    """
+
+    nodes: Sequence[Hashable]
+    index: Dict[Hashable, int]
+    offsets: np.ndarray
+    targets: np.ndarray
+    capacities: np.ndarray
+    costs: np.ndarray
+
+    @staticmethod
+    def from_networkx(graph: nx.DiGraph, capacity: str = "capacity", cost: str = "cost") -> FlowGraph:
+        """
+        Compile a networkx graph, e.g. one made by ``generate_flow_network``.
+
+        :param graph: The graph to compile.
+        :param capacity: The edge attribute holding the capacity.
+        :param cost: The edge attribute holding the cost, edges without it cost 0.
+        :returns graph: The compiled graph.
+        """
+        nodes = list(graph.nodes())
+        index = {node: i for i, node in enumerate(nodes)}
+        edges = [(index[u], index[v], data.get(capacity, 0), data.get(cost, 0)) for u, v, data in graph.edges(data=True)]
+        sources = np.asarray([edge[0] for edge in edges], dtype=np.int64)
+        order = np.argsort(sources, kind="stable")
+
+        offsets = np.zeros(len(nodes) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(sources, minlength=len(nodes)))
+
+        return FlowGraph(
+            nodes=nodes,
+            index=index,
+            offsets=offsets,
+            targets=np.asarray([edge[1] for edge in edges], dtype=np.int64)[order],
+            capacities=np.asarray([edge[2] for edge in edges], dtype=np.float64)[order],
+            costs=np.asarray([edge[3] for edge in edges], dtype=np.float64)[order],
+        )
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def levels(self) -> np.ndarray:
+        """The distinct capacities, ascending."""
+        cached = self.__dict__.get("_levels")
+
+        if cached is None:
+            cached = np.unique(self.capacities)
+            object.__setattr__(self, "_levels", cached)
+
+        return cached
+
+    def subgraph(self, min_capacity: float, weights: np.ndarray) -> csr_matrix:
+        """
+        Get the edges with at least ``min_capacity`` as sparse matrix for ``scipy.sparse.csgraph``.
+
+        :param min_capacity: Edges with less capacity are dropped.
+        :param weights: The value of every edge in the matrix, explicit zeros still are edges.
+        :returns matrix: The adjacency matrix of the kept edges.
+        """
+        keep = self.capacities >= min_capacity
+        offsets = np.concatenate(([0], np.cumsum(keep)))[self.offsets]
+
+        return csr_matrix((weights[keep], self.targets[keep], offsets), shape=(len(self), len(self)))
+
+
+class _Reachability:
+    """Breadth first searches from one source over the edges above a capacity level, cached per level."""
+
+    def __init__(self, graph: FlowGraph, source: int):
+        self.graph = graph
+        self.source = source
+        self.ones = np.ones(len(graph.targets))
+        self.searches: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def search(self, level: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Which nodes are reached using edges of at least the given level, and their predecessors."""
+        if level not in self.searches:
+            matrix = self.graph.subgraph(self.graph.levels[level], self.ones)
+            order, predecessors = breadth_first_order(matrix, self.source, directed=True, return_predecessors=True)
+            reached = np.zeros(len(self.graph), dtype=bool)
+            reached[order] = True
+            self.searches[level] = (reached, predecessors)
+
+        return self.searches[level]
+
+    def widest(self, target: int) -> int:
+        """
+        Binary search the highest level that still reaches the target, -1 if even level 0 does not.
+
+        Reachability only shrinks with rising levels, so the highest reaching level is the
+        bottleneck of the widest path, and the search tree at that level contains such a path.
+        """
+        low, high = -1, len(self.graph.levels) - 1
+
+        while low < high:
+            middle = (low + high + 1) // 2
+
+            if self.search(middle)[0][target]:
+                low = middle
+            else:
+                high = middle - 1
+
+        return low
+
+
+def widest_path(graph: FlowGraph, source: Hashable, target: Hashable) -> List[Hashable]:
+    """
+    Find the path with maximum capacity, like ``path_with_maximum_capacity`` in the notebook.
+
+    :param graph: The compiled graph.
+    :param source: The source node.
+    :param target: The target node.
+    :returns path: The nodes of the path, empty if the target is unreachable.
+    """
+    return widest_paths(graph, [(source, target)])[0]
+
+
+def widest_cheapest_path(graph: FlowGraph, source: Hashable, target: Hashable) -> List[Hashable]:
+    """
+    Find the cheapest of all paths with maximum capacity.
+
+    Labels compared lexicographically by (capacity, -cost) are not optimal per node: a narrow
+    but cheap prefix can lose to a wide expensive one at an inner node and still be part of the
+    best path, once a later edge limits the capacity anyway. So the maximum capacity is found
+    first, then the cheapest path over the edges with at least that capacity.
+
+    :param graph: The compiled graph, costs must not be negative.
+    :param source: The source node.
+    :param target: The target node.
+    :returns path: The nodes of the path, empty if the target is unreachable.
+    """
+    return widest_cheapest_paths(graph, [(source, target)])[0]
+
+
+def bottleneck(graph: FlowGraph, path: Sequence[Hashable]) -> float:
+    """
+    Get the capacity of a path.
+
+    :param graph: The compiled graph.
+    :param path: The nodes of the path.
+    :returns capacity: The smallest capacity of its edges, infinity for a single node, 0 for no path.
+    """
+    if not path:
+        return 0.0
+
+    capacity = np.inf
+
+    for u, v in zip(path, path[1:]):
+        start, stop = graph.offsets[graph.index[u]], graph.offsets[graph.index[u] + 1]
+        edge = start + int(np.flatnonzero(graph.targets[start:stop] == graph.index[v])[0])
+        capacity = min(capacity, graph.capacities[edge])
+
+    return float(capacity)
+
+
+def widest_paths(graph: FlowGraph, pairs: Iterable[Tuple[Hashable, Hashable]]) -> List[List[Hashable]]:
+    """
+    Answer many maximum capacity queries, searches are shared between pairs with the same source.
+
+    :param graph: The compiled graph.
+    :param pairs: The (source, target) pairs.
+    :returns paths: The path of every pair, in the order of the pairs.
+    """
+    pairs = list(pairs)
+    paths: List[List[Hashable]] = [[] for _ in pairs]
+
+    for start, queries in _by_source(graph, pairs).items():
+        reachability = _Reachability(graph, start)
+
+        for position, goal in queries:
+            if goal == start:
+                paths[position] = [graph.nodes[start]]
+                continue
+
+            level = reachability.widest(goal)
+
+            if level >= 0:
+                paths[position] = _path(graph, reachability.search(level)[1], start, goal)
+
+    return paths
+
+
+def widest_cheapest_paths(graph: FlowGraph, pairs: Iterable[Tuple[Hashable, Hashable]]) -> List[List[Hashable]]:
+    """
+    Answer many maximum capacity, minimum cost queries.
+
+    Pairs with the same source share their searches, and one cheapest path search is done
+    per source and distinct maximum capacity of its targets.
+
+    :param graph: The compiled graph, costs must not be negative.
+    :param pairs: The (source, target) pairs.
+    :returns paths: The path of every pair, in the order of the pairs.
+    """
+    pairs = list(pairs)
+    paths: List[List[Hashable]] = [[] for _ in pairs]
+
+    for start, queries in _by_source(graph, pairs).items():
+        reachability = _Reachability(graph, start)
+        by_level: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+
+        for position, goal in queries:
+            if goal == start:
+                paths[position] = [graph.nodes[start]]
+                continue
+
+            level = reachability.widest(goal)
+
+            if level >= 0:
+                by_level[level].append((position, goal))
+
+        for level, targets in by_level.items():
+            matrix = graph.subgraph(graph.levels[level], graph.costs)
+            _, predecessors = dijkstra(matrix, directed=True, indices=start, return_predecessors=True)
+
+            for position, goal in targets:
+                paths[position] = _path(graph, predecessors, start, goal)
+
+    return paths
+
+
+def _by_source(graph: FlowGraph, pairs: List[Tuple[Hashable, Hashable]]) -> Dict[int, List[Tuple[int, int]]]:
+    """Group the queries by source, remembering their position."""
+    grouped: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+
+    for position, (source, target) in enumerate(pairs):
+        grouped[graph.index[source]].append((position, graph.index[target]))
+
+    return grouped
+
+
+def _path(graph: FlowGraph, predecessors: np.ndarray, start: int, goal: int) -> List[Hashable]:
+    """Follow the predecessors back from the goal, empty if it was not reached."""
+    if goal != start and predecessors[goal] == NO_PREDECESSOR:
+        return []
+
+    path = [goal]
+
+    while path[-1] != start:
+        path.append(int(predecessors[path[-1]]))
+
+    return [graph.nodes[node] for node in reversed(path)]
@@ -0,0 +1,27 @@
+"""Fast loading and routing on GTFS timetable data."""
+
+from .loader import GtfsFeed, Table, load_feed, parse_feed
+from .routing import StopGraph, a_star, dijkstra
+from .landmarks import Landmarks, build_landmarks
+from .service_calendar import ServiceCalendar
+from .timetable import Journey, Leg, Timetable
+from .spatial import StopIndex, distance_matrix, haversine
+
+__all__ = [
+    "GtfsFeed",
+    "Table",
+    "load_feed",
+    "parse_feed",
+    "StopGraph",
+    "a_star",
+    "dijkstra",
+    "Landmarks",
+    "build_landmarks",
+    "ServiceCalendar",
+    "Journey",
+    "Leg",
+    "Timetable",
+    "StopIndex",
+    "distance_matrix",
+    "haversine",
+]
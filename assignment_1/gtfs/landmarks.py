@@ -0,0 +1,170 @@
+"""Landmark (ALT) heuristic: lower bounds on travel minutes from precomputed landmark distances."""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+import numpy as np
+from .routing import StopGraph, StopLike, distances
+
+SAFETY = 1 - 1e-6
+"""Shrinks every bound a little, for rounding differences between the float64 sums of the searches."""
+
+ROUNDING = float(np.finfo(np.float32).eps) / 2
+"""The relative error of a distance stored as float32, every stored value is off by at most this share of itself."""
+
+
+@dataclass(frozen=True)
+class Landmarks:
+    """
+    Travel minutes between a few landmark stops and all stops.
+
+    ``forward[v, k]`` is the distance from landmark k to stop v, ``backward[v, k]`` the distance
+    from stop v to landmark k. By the triangle inequality both
+
+    - ``forward[goal, k] - forward[v, k]`` and
+    - ``backward[v, k] - backward[goal, k]``
+
+    are lower bounds of the distance from v to the goal, the largest of them is the heuristic.
+    """
+
+    graph: StopGraph
+    stops: np.ndarray
+    forward: np.ndarray
+    backward: np.ndarray
+
+    def __call__(self, source: StopLike, goal: StopLike) -> float:
+        """
+        Estimate the travel minutes between two stops, usable as heuristic of ``a_star``.
+
+        :param source: The current stop.
+        :param goal: The goal stop.
+        :returns minutes: A lower bound of the travel minutes, infinity if the goal is unreachable.
+        """
+        return self.bound(self.graph.index[source.id], self.graph.index[goal.id])
+
+    def bound(self, source: int, goal: int) -> float:
+        """
+        Estimate the travel minutes between two stops given by their index.
+
+        :param source: The index of the current stop.
+        :param goal: The index of the goal stop.
+        :returns minutes: A lower bound of the travel minutes, infinity if the goal is unreachable.
+        """
+        return float(self.bounds(goal)[source])
+
+    def bounds(self, goal: int) -> np.ndarray:
+        """
+        Estimate the travel minutes from every stop to a goal at once, cached for the last goal.
+
+        :param goal: The index of the goal stop.
+        :returns minutes: A lower bound of the travel minutes per stop index, infinity where the goal is unreachable.
+        """
+        cached = self.__dict__.get("_bounds_cache")
+
+        if cached is not None and cached[0] == goal:
+            return cached[1]
+
+        forward, backward = self._scaled()
+        goal_forward = self.forward[goal].astype(np.float64)[:, None] * (1 - ROUNDING)
+        goal_backward = self.backward[goal].astype(np.float64)[:, None] * (1 + ROUNDING)
+
+        # The stored float32 values are rounded, so every distance may be off by ROUNDING of itself:
+        # the subtracted distance is taken as large and the other one as small as it could be. A
+        # landmark where both distances are infinite gives nan, fmax skips it.
+        with np.errstate(invalid="ignore"):
+            result = np.fmax(np.fmax.reduce(goal_forward - forward, axis=0), np.fmax.reduce(backward - goal_backward, axis=0))
+
+        result = np.fmax(result, 0.0) * SAFETY
+        object.__setattr__(self, "_bounds_cache", (goal, result))
+
+        return result
+
+    def _scaled(self) -> tuple[np.ndarray, np.ndarray]:
+        """``forward`` scaled up and ``backward`` scaled down by their rounding error, as float64 with a row per landmark."""
+        cached = self.__dict__.get("_scaled_cache")
+
+        if cached is None:
+            forward = self.forward.T.astype(np.float64) * (1 + ROUNDING)
+            backward = self.backward.T.astype(np.float64) * (1 - ROUNDING)
+            cached = (np.ascontiguousarray(forward), np.ascontiguousarray(backward))
+            object.__setattr__(self, "_scaled_cache", cached)
+
+        return cached
+
+    def save(self, path: Path | str) -> None:
+        """
+        Store the landmark distances, together with the stop ids to check they fit a graph.
+
+        :param path: The ``.npz`` file to write.
+        """
+        np.savez(
+            path,
+            stop_ids=np.asarray([stop.id for stop in self.graph.stops], dtype=str),
+            stops=self.stops,
+            forward=self.forward,
+            backward=self.backward,
+        )
+
+    @staticmethod
+    def load(path: Path | str, graph: StopGraph) -> Landmarks:
+        """
+        Load landmark distances stored with ``save``.
+
+        :param path: The ``.npz`` file to read.
+        :param graph: The graph the distances were computed on.
+        :returns landmarks: The loaded landmarks.
+        :raises ValueError: If the file was computed for other stops.
+        """
+        with np.load(path) as data:
+            if data["stop_ids"].tolist() != [stop.id for stop in graph.stops]:
+                raise ValueError(f"The landmarks in '{path}' belong to another graph.")
+
+            return Landmarks(graph=graph, stops=data["stops"], forward=data["forward"], backward=data["backward"])
+
+
+def build_landmarks(graph: StopGraph, count: int = 16, first: Optional[int] = None) -> Landmarks:
+    """
+    Pick landmarks by farthest-point selection and compute their distances.
+
+    Every new landmark is the stop farthest away from all landmarks picked so far. Stops that no
+    landmark reaches are picked first, so every part of a disconnected network gets a landmark,
+    stops without any connection are never picked.
+
+    :param graph: The compiled stop network.
+    :param count: The number of landmarks, at most the number of stops.
+    :param first: The index of the first landmark, the stop with the most connections if omitted.
+    :returns landmarks: The landmarks and their distances.
+    """
+    size = len(graph)
+    count = min(count, size)
+    reverse = graph.reversed()
+
+    if first is None:
+        first = int(np.argmax(np.diff(graph.offsets))) if size else 0
+
+    stops = np.empty(count, dtype=np.int32)
+    forward = np.empty((size, count), dtype=np.float32)
+    backward = np.empty((size, count), dtype=np.float32)
+    nearest = np.full(size, np.inf)
+    isolated = (np.diff(graph.offsets) == 0) & (np.diff(reverse.offsets) == 0)
+    landmark = first
+
+    for k in range(count):
+        stops[k] = landmark
+        to_stops = distances(graph, landmark)
+        from_stops = distances(reverse, landmark)
+        forward[:, k] = to_stops
+        backward[:, k] = from_stops
+
+        nearest = np.minimum(nearest, np.minimum(to_stops, from_stops))
+        nearest[stops[:k + 1]] = -1
+        nearest[isolated] = -1
+        landmark = int(np.argmax(nearest))
+
+        if nearest[landmark] < 0:
+            # Every stop with connections is a landmark already
+            count = k + 1
+            break
+
+    return Landmarks(graph=graph, stops=stops[:count], forward=forward[:, :count].copy(), backward=backward[:, :count].copy())
@@ -0,0 +1,387 @@
+"""Columnar GTFS loader with a memory-mapped NumPy cache."""
+
+from __future__ import annotations
+import json
+import os
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Tuple, TypeVar
+import numpy as np
+import pandas as pd
+
+CACHE_DIR_NAME = ".gtfs_cache"
+"""Name of the cache directory, created next to the CSV files."""
+
+CACHE_VERSION = 1
+"""Bump when the layout of the cached columns changes."""
+
+SOURCES = ("stops.csv", "trips.csv", "stop_times.csv", "calendar.csv", "calendar_dates.csv")
+"""The CSV files the cache depends on."""
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+NO_TIME = -1
+"""Time value of stop times without an arrival or departure time."""
+
+S = TypeVar("S")
+C = TypeVar("C")
+
+
+@dataclass(frozen=True)
+class Table:
+    """Equally long NumPy columns of a GTFS table."""
+
+    name: str
+    columns: Mapping[str, np.ndarray]
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.columns
+
+
+@dataclass(frozen=True)
+class GtfsFeed:
+    """
+    A GTFS feed stored as typed columns.
+
+    Ids are replaced by dense integer codes, which index the sorted id arrays ``stop_ids``,
+    ``trip_ids``, ``route_ids`` and ``service_ids``. Times are seconds after midnight of the
+    service day and may exceed 24 hours, dates are integers in the form YYYYMMDD.
+
+    - ``stops``: ``name``, ``lat``, ``lon``, ``parent`` (stop code or -1) and ``location_type``
+    - ``trips``: ``route`` and ``service``, row i belongs to trip code i
+    - ``stop_times``: ``trip``, ``stop``, ``sequence``, ``arrival`` and ``departure``, sorted by trip and sequence
+    - ``calendar``: ``service``, ``weekdays`` (one boolean column per day), ``start_date`` and ``end_date``
+    - ``calendar_dates``: ``service``, ``date`` and ``exception_type``
+    """
+
+    stop_ids: np.ndarray
+    trip_ids: np.ndarray
+    route_ids: np.ndarray
+    service_ids: np.ndarray
+    stops: Table
+    trips: Table
+    stop_times: Table
+    calendar: Table
+    calendar_dates: Table
+    _stop_codes: Dict[str, int] = field(default_factory=dict, repr=False, compare=False)
+
+    def stop_code(self, stop_id: str) -> int:
+        """
+        Get the dense code of a stop.
+
+        :param stop_id: The GTFS id of the stop.
+        :returns code: The index of the stop in ``stop_ids`` and the rows of ``stops``.
+        :raises KeyError: If the stop does not exist.
+        """
+        if not self._stop_codes:
+            self._stop_codes.update((stop_id, code) for code, stop_id in enumerate(self.stop_ids.tolist()))
+
+        return self._stop_codes[stop_id]
+
+    def trip_bounds(self) -> np.ndarray:
+        """
+        Get where the stop times of every trip start.
+
+        :returns bounds: Row ``bounds[t]`` up to ``bounds[t + 1]`` of ``stop_times`` belong to trip code t.
+        """
+        return np.searchsorted(self.stop_times["trip"], np.arange(len(self.trip_ids) + 1)).astype(np.int64)
+
+    def hops(self) -> Table:
+        """
+        Get every ride between two consecutive stops of a trip.
+
+        :returns hops: A table with the columns ``trip``, ``from_stop``, ``to_stop``, ``departure`` and ``arrival``.
+        """
+        trips = self.stop_times["trip"]
+        same_trip = trips[1:] == trips[:-1]
+
+        return Table(
+            name="hops",
+            columns={
+                "trip": trips[:-1][same_trip],
+                "from_stop": self.stop_times["stop"][:-1][same_trip],
+                "to_stop": self.stop_times["stop"][1:][same_trip],
+                "departure": self.stop_times["departure"][:-1][same_trip],
+                "arrival": self.stop_times["arrival"][1:][same_trip],
+            },
+        )
+
+    def to_stops(self, stop: Callable[..., S], connection: Callable[..., C]) -> List[S]:
+        """
+        Build the ``Stop`` and ``Connection`` objects used in the notebook.
+
+        Every pair of consecutive stops of a trip becomes a connection, its travel time is the
+        arrival at the target minus the departure at the source in minutes.
+
+        :param stop: Creates a stop from ``id``, ``name``, ``lat``, ``lon`` and ``connections``.
+        :param connection: Creates a connection from ``target_stop_id`` and ``travel_minutes``.
+        :returns stops: One object per stop, in the order of ``stop_ids``.
+        """
+        hops = self.hops()
+        minutes = (hops["arrival"] - hops["departure"]) / 60
+        unique = pd.DataFrame({"from": hops["from_stop"], "to": hops["to_stop"], "minutes": minutes}).drop_duplicates()
+
+        connections: List[set] = [set() for _ in range(len(self.stop_ids))]
+        stop_ids = self.stop_ids.tolist()
+
+        for source, target, travel_minutes in zip(unique["from"].tolist(), unique["to"].tolist(), unique["minutes"].tolist()):
+            connections[source].add(connection(target_stop_id=stop_ids[target], travel_minutes=travel_minutes))
+
+        return [
+            stop(id=stop_id, name=name, lat=lat, lon=lon, connections=frozenset(stop_connections))
+            for stop_id, name, lat, lon, stop_connections in zip(
+                stop_ids,
+                self.stops["name"].tolist(),
+                self.stops["lat"].tolist(),
+                self.stops["lon"].tolist(),
+                connections,
+            )
+        ]
+
+    def tables(self) -> Iterator[Table]:
+        """Iterate over all tables, including the id arrays as single column tables."""
+        yield Table("ids", {
+            "stop_ids": self.stop_ids,
+            "trip_ids": self.trip_ids,
+            "route_ids": self.route_ids,
+            "service_ids": self.service_ids,
+        })
+        yield from (self.stops, self.trips, self.stop_times, self.calendar, self.calendar_dates)
+
+
+def load_feed(base_dir: Path | str, cache: bool = True) -> GtfsFeed:
+    """
+    Load a GTFS feed, from the cache if it is up to date.
+
+    The cache lives in ``.gtfs_cache`` next to the CSV files. Every column is a ``.npy`` file
+    that is memory-mapped read-only, and a manifest records the size and modification time of
+    the CSV files it was built from. A change to any of them rebuilds the cache.
+
+    :param base_dir: The directory with the CSV files.
+    :param cache: If the cache should be used and written.
+    :returns feed: The loaded feed.
+    :raises FileNotFoundError: If a required CSV file is missing.
+    """
+    base_dir = Path(base_dir)
+    cache_dir = base_dir / CACHE_DIR_NAME
+
+    if cache:
+        feed = _read_cache(base_dir, cache_dir)
+
+        if feed is not None:
+            return feed
+
+    feed = parse_feed(base_dir)
+
+    if cache:
+        _write_cache(base_dir, cache_dir, feed)
+        # Hand out the memory-mapped columns, so the parsed copies can be freed
+        return _read_cache(base_dir, cache_dir) or feed
+
+    return feed
+
+
+def parse_feed(base_dir: Path | str) -> GtfsFeed:
+    """
+    Parse a GTFS feed from its CSV files without using the cache.
+
+    :param base_dir: The directory with the CSV files.
+    :returns feed: The parsed feed.
+    :raises FileNotFoundError: If a required CSV file is missing.
+    """
+    base_dir = Path(base_dir)
+    stops = _read_csv(base_dir / "stops.csv", ["stop_id", "stop_name", "stop_lat", "stop_lon", "parent_station", "location_type"])
+    trips = _read_csv(base_dir / "trips.csv", ["trip_id", "route_id", "service_id"])
+    stop_times = _read_csv(base_dir / "stop_times.csv", ["trip_id", "stop_id", "stop_sequence", "arrival_time", "departure_time"])
+    calendar = _read_csv(base_dir / "calendar.csv", ["service_id", *WEEKDAYS, "start_date", "end_date"], required=False)
+    calendar_dates = _read_csv(base_dir / "calendar_dates.csv", ["service_id", "date", "exception_type"], required=False)
+
+    stop_ids = _unique(stops["stop_id"])
+    trip_ids = _unique(trips["trip_id"])
+    route_ids = _unique(trips["route_id"])
+    service_ids = _unique(pd.concat([trips["service_id"], calendar["service_id"], calendar_dates["service_id"]]))
+
+    stop_order = np.argsort(_codes(stop_ids, stops["stop_id"]))
+    trip_order = np.argsort(_codes(trip_ids, trips["trip_id"]))
+
+    stop_time_trips = _codes(trip_ids, stop_times["trip_id"])
+    stop_time_sequences = _integers(stop_times["stop_sequence"], np.int32)
+    stop_time_order = np.lexsort((stop_time_sequences, stop_time_trips))
+
+    return GtfsFeed(
+        stop_ids=stop_ids,
+        trip_ids=trip_ids,
+        route_ids=route_ids,
+        service_ids=service_ids,
+        stops=Table("stops", {
+            "name": _strings(stops["stop_name"])[stop_order],
+            "lat": stops["stop_lat"].astype(np.float64).to_numpy()[stop_order],
+            "lon": stops["stop_lon"].astype(np.float64).to_numpy()[stop_order],
+            "parent": _codes(stop_ids, stops["parent_station"])[stop_order],
+            "location_type": _integers(stops["location_type"], np.int8)[stop_order],
+        }),
+        trips=Table("trips", {
+            "route": _codes(route_ids, trips["route_id"])[trip_order],
+            "service": _codes(service_ids, trips["service_id"])[trip_order],
+        }),
+        stop_times=Table("stop_times", {
+            "trip": stop_time_trips[stop_time_order],
+            "stop": _codes(stop_ids, stop_times["stop_id"])[stop_time_order],
+            "sequence": stop_time_sequences[stop_time_order],
+            "arrival": parse_times(stop_times["arrival_time"])[stop_time_order],
+            "departure": parse_times(stop_times["departure_time"])[stop_time_order],
+        }),
+        calendar=Table("calendar", {
+            "service": _codes(service_ids, calendar["service_id"]),
+            "weekdays": np.stack([calendar[day].to_numpy() == "1" for day in WEEKDAYS], axis=1).reshape(-1, 7),
+            "start_date": _integers(calendar["start_date"], np.int32),
+            "end_date": _integers(calendar["end_date"], np.int32),
+        }),
+        calendar_dates=Table("calendar_dates", {
+            "service": _codes(service_ids, calendar_dates["service_id"]),
+            "date": _integers(calendar_dates["date"], np.int32),
+            "exception_type": _integers(calendar_dates["exception_type"], np.int8),
+        }),
+    )
+
+
+def parse_times(times: pd.Series) -> np.ndarray:
+    """
+    Convert GTFS times (HH:MM:SS, hours may exceed 23) to seconds.
+
+    :param times: The times as strings.
+    :returns seconds: The seconds after midnight, ``NO_TIME`` for empty values.
+    """
+    parts = times.str.split(":", n=2, expand=True)
+
+    if parts.shape[1] < 3:
+        return np.full(len(times), NO_TIME, dtype=np.int32)
+
+    valid = (times != "").to_numpy()
+    seconds = np.full(len(times), NO_TIME, dtype=np.int32)
+    hours, minutes, secs = (parts[i][valid].astype(np.int32).to_numpy() for i in range(3))
+    seconds[valid] = hours * 3600 + minutes * 60 + secs
+
+    return seconds
+
+
+def _read_csv(path: Path, columns: List[str], required: bool = True) -> pd.DataFrame:
+    """Read the given columns of a CSV file as strings, missing optional files and columns are empty."""
+    if not path.exists():
+        if required:
+            raise FileNotFoundError(f"GTFS file {path} does not exist.")
+
+        return pd.DataFrame({column: pd.Series(dtype=str) for column in columns})
+
+    frame = pd.read_csv(path, dtype=str, keep_default_na=False, usecols=lambda column: column in columns)
+
+    for column in columns:
+        if column not in frame:
+            if required and column.endswith("_id"):
+                raise ValueError(f"GTFS file {path} has no column '{column}'.")
+
+            frame[column] = ""
+
+    return frame
+
+
+def _unique(ids: pd.Series) -> np.ndarray:
+    """The sorted, distinct non-empty ids as fixed width string array."""
+    values = ids.to_numpy(dtype=str)
+
+    return np.unique(values[values != ""]).astype(str)
+
+
+def _codes(ids: np.ndarray, values: pd.Series) -> np.ndarray:
+    """The index of every value in the sorted ids, -1 for unknown and empty values."""
+    values_array = values.to_numpy(dtype=str)
+    codes = np.searchsorted(ids, values_array).astype(np.int32)
+    codes[codes >= len(ids)] = -1
+    known = codes >= 0
+    known[known] = ids[codes[known]] == values_array[known]
+    codes[~known] = -1
+
+    return codes
+
+
+def _integers(values: pd.Series, dtype: type) -> np.ndarray:
+    """Parse integers, empty values become 0."""
+    return pd.to_numeric(values.replace("", "0")).to_numpy().astype(dtype)
+
+
+def _strings(values: pd.Series) -> np.ndarray:
+    """Convert to a fixed width string array, which can be memory-mapped unlike object arrays."""
+    return values.to_numpy(dtype=str).astype(str)
+
+
+def _fingerprint(base_dir: Path) -> Dict[str, Tuple[int, int]]:
+    """Size and modification time of every existing source file."""
+    fingerprint = {}
+
+    for name in SOURCES:
+        path = base_dir / name
+
+        if path.exists():
+            stat = path.stat()
+            fingerprint[name] = (stat.st_size, stat.st_mtime_ns)
+
+    return fingerprint
+
+
+def _read_cache(base_dir: Path, cache_dir: Path) -> Optional[GtfsFeed]:
+    """Map the cached columns, None if the cache is missing or outdated."""
+    try:
+        with open(cache_dir / "manifest.json", encoding="utf-8") as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    if manifest.get("version") != CACHE_VERSION or manifest.get("sources") != {
+        name: list(value) for name, value in _fingerprint(base_dir).items()
+    }:
+        return None
+
+    try:
+        tables = {
+            table: {column: np.load(cache_dir / f"{table}.{column}.npy", mmap_mode="r") for column in columns}
+            for table, columns in manifest["tables"].items()
+        }
+    except (OSError, ValueError, KeyError):
+        return None
+
+    ids = tables.pop("ids")
+
+    return GtfsFeed(**ids, **{name: Table(name, columns) for name, columns in tables.items()})
+
+
+def _write_cache(base_dir: Path, cache_dir: Path, feed: GtfsFeed) -> None:
+    """Store every column as ``.npy`` file, the manifest is written last and marks the cache as complete."""
+    fingerprint = _fingerprint(base_dir)
+    temporary = cache_dir.with_name(f"{CACHE_DIR_NAME}.{os.getpid()}.tmp")
+
+    try:
+        shutil.rmtree(temporary, ignore_errors=True)
+        temporary.mkdir(parents=True)
+        tables = {}
+
+        for table in feed.tables():
+            tables[table.name] = list(table.columns)
+
+            for column, values in table.columns.items():
+                np.save(temporary / f"{table.name}.{column}.npy", np.ascontiguousarray(values))
+
+        with open(temporary / "manifest.json", "w", encoding="utf-8") as file:
+            json.dump({"version": CACHE_VERSION, "sources": fingerprint, "tables": tables}, file, indent=2)
+
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        os.replace(temporary, cache_dir)
+    except OSError:
+        # A read-only data directory only means every load parses the CSV files
+        shutil.rmtree(temporary, ignore_errors=True)
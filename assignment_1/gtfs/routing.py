@@ -0,0 +1,276 @@
+"""Shortest paths on the stop network, compiled to compressed sparse row arrays."""
+
+from __future__ import annotations
+import heapq
+import math
+from dataclasses import dataclass
+from typing import AbstractSet, Callable, Dict, Generic, List, Optional, Protocol, Sequence, Tuple, TypeVar
+import numpy as np
+
+
+class ConnectionLike(Protocol):
+    """What the router needs from a connection, matches the notebook's ``Connection``."""
+
+    @property
+    def target_stop_id(self) -> str: ...
+
+    @property
+    def travel_minutes(self) -> float: ...
+
+
+class StopLike(Protocol):
+    """What the router needs from a stop, matches the notebook's ``Stop``."""
+
+    @property
+    def id(self) -> str: ...
+
+    @property
+    def connections(self) -> AbstractSet: ...
+
+
+S = TypeVar("S", bound=StopLike)
+
+Heuristic = Callable[[S, S], float]
+Path = List[Tuple[S, ConnectionLike]]
+
+
+@dataclass(frozen=True)
+class StopGraph(Generic[S]):
+    """
+    The stops and connections as compressed sparse row arrays.
+
+    The connections of stop i are the entries ``offsets[i]`` up to ``offsets[i + 1]`` of
+    ``targets``, ``minutes`` and ``connections``. Connections to unknown stops are dropped.
+    """
+
+    stops: Sequence[S]
+    index: Dict[str, int]
+    offsets: np.ndarray
+    targets: np.ndarray
+    minutes: np.ndarray
+    connections: Sequence[ConnectionLike]
+
+    @staticmethod
+    def from_stops(stops: Sequence[S]) -> StopGraph[S]:
+        """
+        Compile a graph.
+
+        :param stops: The stops with their outgoing connections.
+        :returns graph: The compiled graph.
+        """
+        index = {stop.id: i for i, stop in enumerate(stops)}
+        offsets = np.zeros(len(stops) + 1, dtype=np.int64)
+        targets: List[int] = []
+        minutes: List[float] = []
+        connections: List[ConnectionLike] = []
+
+        for i, stop in enumerate(stops):
+            # Sorted so equal inputs always compile to equal arrays
+            for connection in sorted(stop.connections, key=lambda c: (c.target_stop_id, c.travel_minutes)):
+                target = index.get(connection.target_stop_id)
+
+                if target is not None:
+                    targets.append(target)
+                    minutes.append(connection.travel_minutes)
+                    connections.append(connection)
+
+            offsets[i + 1] = len(targets)
+
+        return StopGraph(
+            stops=stops,
+            index=index,
+            offsets=offsets,
+            targets=np.asarray(targets, dtype=np.int32),
+            minutes=np.asarray(minutes, dtype=np.float64),
+            connections=connections,
+        )
+
+    def __len__(self) -> int:
+        return len(self.stops)
+
+    def stop(self, stop_id: str) -> S:
+        """
+        Get a stop by its id.
+
+        :param stop_id: The id of the stop.
+        :returns stop: The stop.
+        :raises KeyError: If the stop does not exist.
+        """
+        return self.stops[self.index[stop_id]]
+
+    def reversed(self) -> StopGraph[S]:
+        """
+        Get the graph with every connection reversed, for searching backwards from a goal.
+
+        :returns graph: The reversed graph, ``connections`` still holds the original connections.
+        """
+        sources = np.repeat(np.arange(len(self.stops), dtype=np.int32), np.diff(self.offsets))
+        order = np.argsort(self.targets, kind="stable")
+        offsets = np.zeros(len(self.stops) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(self.targets, minlength=len(self.stops)))
+
+        return StopGraph(
+            stops=self.stops,
+            index=self.index,
+            offsets=offsets,
+            targets=sources[order],
+            minutes=self.minutes[order],
+            connections=[self.connections[i] for i in order.tolist()],
+        )
+
+    def adjacency(self) -> Tuple[List[int], List[int], List[float]]:
+        """
+        Get the arrays as Python lists, which are much faster to index one by one than NumPy arrays.
+
+        :returns adjacency: The offsets, targets and minutes.
+        """
+        cached = self.__dict__.get("_adjacency")
+
+        if cached is None:
+            cached = (self.offsets.tolist(), self.targets.tolist(), self.minutes.tolist())
+            object.__setattr__(self, "_adjacency", cached)
+
+        return cached
+
+
+def a_star(
+    graph: StopGraph[S],
+    heuristic: Optional[Heuristic],
+    start_id: str,
+    goal_id: str,
+) -> Tuple[Path, float]:
+    """
+    Find the shortest path between two stops, with the same result format as the notebook's ``a_star``.
+
+    :param graph: The compiled stop network.
+    :param heuristic: Estimates the remaining minutes from a stop to the goal, Dijkstra's algorithm if None.
+        A heuristic built on this graph with a ``bounds(goal)`` method returning the estimates of
+        all stops by index, like ``Landmarks``, is asked once per search instead of once per stop.
+    :param start_id: The id of the stop to start the search from.
+    :param goal_id: The id of the stop to search a path to.
+    :returns result: The stops together with the connections taken from them, and the total minutes.
+        An empty path and infinity if the goal is unreachable.
+    :raises ValueError: If the start or goal stop does not exist.
+    """
+    start = graph.index.get(start_id)
+    goal = graph.index.get(goal_id)
+
+    if start is None or goal is None:
+        raise ValueError(f"Start or goal stop not found: {start_id}, {goal_id}")
+
+    if heuristic is None:
+        estimate = None
+    elif getattr(heuristic, "graph", None) is graph and hasattr(heuristic, "bounds"):
+        # like Landmarks, the estimates of all stops are computed at once and only looked up
+        estimate = heuristic.bounds(goal).tolist().__getitem__  # type: ignore[attr-defined]
+    else:
+        goal_stop = graph.stops[goal]
+        stops = graph.stops
+        estimate = lambda i: heuristic(stops[i], goal_stop)  # noqa: E731
+
+    distance, parent = _search(graph, start, goal, estimate)
+
+    if distance[goal] == math.inf:
+        return [], math.inf
+
+    return _path(graph, parent, goal), distance[goal]
+
+
+def dijkstra(graph: StopGraph[S], start_id: str, goal_id: str) -> Tuple[Path, float]:
+    """
+    Find the shortest path between two stops without a heuristic.
+
+    :param graph: The compiled stop network.
+    :param start_id: The id of the stop to start the search from.
+    :param goal_id: The id of the stop to search a path to.
+    :returns result: See ``a_star``.
+    :raises ValueError: If the start or goal stop does not exist.
+    """
+    return a_star(graph, None, start_id, goal_id)
+
+
+def distances(graph: StopGraph, source: int) -> np.ndarray:
+    """
+    Get the shortest travel minutes from one stop to all stops.
+
+    :param graph: The compiled stop network.
+    :param source: The index of the stop to start from.
+    :returns minutes: The minutes to every stop, infinity for unreachable stops.
+    """
+    return np.asarray(_search(graph, source, None, None)[0], dtype=np.float64)
+
+
+def _search(
+    graph: StopGraph,
+    start: int,
+    goal: Optional[int],
+    estimate: Optional[Callable[[int], float]],
+) -> Tuple[List[float], List[int]]:
+    """
+    A* with a binary heap and lazy deletion, Dijkstra's algorithm without an estimate.
+
+    Every stop is expanded at most once, like in the notebook. The estimate is evaluated once per stop,
+    stops with an infinite estimate can not reach the goal and are never queued.
+    """
+    offsets, targets, minutes = graph.adjacency()
+    size = len(graph.stops)
+    distance = [math.inf] * size
+    parent = [-1] * size
+    closed = [False] * size
+    estimates: List[Optional[float]] = [None] * size
+    push, pop = heapq.heappush, heapq.heappop
+
+    distance[start] = 0.0
+    heap = [(estimate(start) if estimate else 0.0, start)]
+
+    if heap[0][0] == math.inf:
+        return distance, parent
+
+    while heap:
+        _, current = pop(heap)
+
+        if closed[current]:
+            continue
+
+        if current == goal:
+            break
+
+        closed[current] = True
+        base = distance[current]
+
+        for edge in range(offsets[current], offsets[current + 1]):
+            target = targets[edge]
+            candidate = base + minutes[edge]
+
+            if candidate < distance[target] and not closed[target]:
+                distance[target] = candidate
+                parent[target] = edge
+
+                if estimate is None:
+                    push(heap, (candidate, target))
+                else:
+                    value = estimates[target]
+
+                    if value is None:
+                        value = estimates[target] = estimate(target)
+
+                    if value != math.inf:
+                        push(heap, (candidate + value, target))
+
+    return distance, parent
+
+
+def _path(graph: StopGraph[S], parent: List[int], goal: int) -> Path:
+    """Follow the parent edges back from the goal."""
+    offsets = graph.offsets
+    path: Path = []
+    edge = parent[goal]
+
+    while edge >= 0:
+        source = int(np.searchsorted(offsets, edge, side="right")) - 1
+        path.append((graph.stops[source], graph.connections[edge]))
+        edge = parent[source]
+
+    path.reverse()
+
+    return path
@@ -0,0 +1,122 @@
+"""Which services run on which day, compiled from ``calendar.csv`` and ``calendar_dates.csv``."""
+
+from __future__ import annotations
+import datetime
+from dataclasses import dataclass
+import numpy as np
+from .loader import GtfsFeed
+
+ADDED = 1
+"""``exception_type`` of a service added on a date."""
+
+REMOVED = 2
+"""``exception_type`` of a service removed on a date."""
+
+EPOCH = datetime.date(1970, 1, 1).toordinal()
+
+
+@dataclass(frozen=True)
+class ServiceCalendar:
+    """
+    A bitmap of the days every service runs on, over the days the feed covers.
+
+    ``active[service, day]`` tells whether the service with that code runs ``day`` days after
+    ``first_day``. Services never run outside of the covered days.
+    """
+
+    first_day: int
+    """The first covered day, in days since 1970-01-01."""
+    active: np.ndarray
+    trip_services: np.ndarray
+    """The service code of every trip."""
+
+    @staticmethod
+    def from_feed(feed: GtfsFeed) -> ServiceCalendar:
+        """
+        Compile the weekly calendar and its exceptions.
+
+        :param feed: The feed to compile.
+        :returns calendar: The compiled calendar.
+        """
+        calendar, exceptions = feed.calendar, feed.calendar_dates
+        starts, ends = _days(calendar["start_date"]), _days(calendar["end_date"])
+        dates = _days(exceptions["date"])
+        bounds = np.concatenate((starts, ends, dates))
+
+        if not len(bounds):
+            active = np.zeros((len(feed.service_ids), 0), dtype=bool)
+            return ServiceCalendar(first_day=0, active=active, trip_services=feed.trips["service"])
+
+        first_day = int(bounds.min())
+        days = np.arange(first_day, int(bounds.max()) + 1)
+
+        # A row runs on the days within its dates whose weekday is set, 1970-01-01 was a thursday
+        running = (starts[:, None] <= days) & (days <= ends[:, None])
+        running &= calendar["weekdays"][:, (days + 3) % 7]
+
+        active = np.zeros((len(feed.service_ids), len(days)), dtype=bool)
+        valid = calendar["service"] >= 0
+        np.logical_or.at(active, calendar["service"][valid], running[valid])
+
+        known = exceptions["service"] >= 0
+        added = known & (exceptions["exception_type"] == ADDED)
+        removed = known & (exceptions["exception_type"] == REMOVED)
+        active[exceptions["service"][added], dates[added] - first_day] = True
+        active[exceptions["service"][removed], dates[removed] - first_day] = False
+
+        return ServiceCalendar(first_day=first_day, active=active, trip_services=feed.trips["service"])
+
+    def __len__(self) -> int:
+        return self.active.shape[1]
+
+    def day(self, date: int) -> int:
+        """
+        Get the column of a date.
+
+        :param date: The day in the form YYYYMMDD.
+        :returns day: The index into the days of ``active``, outside of ``range(len(self))`` if not covered.
+        """
+        return datetime.date(date // 10000, date // 100 % 100, date % 100).toordinal() - EPOCH - self.first_day
+
+    def is_active(self, service: int, date: int) -> bool:
+        """
+        Check whether a service runs on a day.
+
+        :param service: The service code.
+        :param date: The day in the form YYYYMMDD.
+        :returns active: If the service runs.
+        """
+        day = self.day(date)
+
+        return 0 <= day < len(self) and bool(self.active[service, day])
+
+    def active_services(self, date: int) -> np.ndarray:
+        """
+        Get which services run on a day.
+
+        :param date: The day in the form YYYYMMDD.
+        :returns active: A boolean per service code.
+        """
+        day = self.day(date)
+
+        if not 0 <= day < len(self):
+            return np.zeros(len(self.active), dtype=bool)
+
+        return self.active[:, day].copy()
+
+    def active_trips(self, date: int) -> np.ndarray:
+        """
+        Get which trips run on a day.
+
+        :param date: The day in the form YYYYMMDD.
+        :returns active: A boolean per trip code.
+        """
+        return self.active_services(date)[self.trip_services]
+
+
+def _days(dates: np.ndarray) -> np.ndarray:
+    """Convert dates in the form YYYYMMDD to days since 1970-01-01."""
+    dates = np.asarray(dates, dtype=np.int64)
+    months = (dates // 10000 - 1970) * 12 + dates // 100 % 100 - 1
+
+    return (months.astype("datetime64[M]").astype("datetime64[D]") + (dates % 100 - 1)).astype(np.int64)
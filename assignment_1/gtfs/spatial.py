@@ -0,0 +1,173 @@
+"""Nearest-stop and radius queries with a k-d tree, and vectorised great-circle distances."""
+
+from __future__ import annotations
+from typing import List, Optional, Protocol, Sequence, Tuple
+import numpy as np
+from scipy.spatial import cKDTree
+from .loader import GtfsFeed
+
+EARTH_RADIUS_KM = 6371.0
+
+
+class Located(Protocol):
+    """Anything with a position, like the notebook's ``Stop``."""
+
+    @property
+    def lat(self) -> float: ...
+
+    @property
+    def lon(self) -> float: ...
+
+
+def haversine(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """
+    Get great-circle distances, the arguments are broadcast against each other.
+
+    :param lat1: Latitudes of the first points in degrees.
+    :param lon1: Longitudes of the first points in degrees.
+    :param lat2: Latitudes of the second points in degrees.
+    :param lon2: Longitudes of the second points in degrees.
+    :returns distances: The distances in kilometers.
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype=np.float64)) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def distance_matrix(lats1, lons1, lats2=None, lons2=None) -> np.ndarray:
+    """
+    Get the great-circle distances between all pairs of two point sets.
+
+    :param lats1: Latitudes of the first points in degrees.
+    :param lons1: Longitudes of the first points in degrees.
+    :param lats2: Latitudes of the second points, the first points if omitted.
+    :param lons2: Longitudes of the second points, the first points if omitted.
+    :returns distances: A (first, second) matrix of distances in kilometers.
+    """
+    if lats2 is None or lons2 is None:
+        lats2, lons2 = lats1, lons1
+
+    return haversine(
+        np.asarray(lats1)[:, None], np.asarray(lons1)[:, None],
+        np.asarray(lats2)[None, :], np.asarray(lons2)[None, :],
+    )
+
+
+def unit_vectors(lats, lons) -> np.ndarray:
+    """
+    Project positions onto the unit sphere, where straight-line distance grows with great-circle distance.
+
+    :param lats: Latitudes in degrees.
+    :param lons: Longitudes in degrees.
+    :returns vectors: An (n, 3) array of points.
+    """
+    lats, lons = np.radians(np.asarray(lats, dtype=np.float64)), np.radians(np.asarray(lons, dtype=np.float64))
+    cos_lat = np.cos(lats)
+
+    return np.stack((cos_lat * np.cos(lons), cos_lat * np.sin(lons), np.sin(lats)), axis=-1)
+
+
+def _chord(kilometers: float) -> float:
+    """Straight-line distance on the unit sphere of a great-circle distance."""
+    return 2 * np.sin(min(kilometers / EARTH_RADIUS_KM, np.pi) / 2)
+
+
+def _kilometers(chords: np.ndarray) -> np.ndarray:
+    """Great-circle distance of straight-line distances on the unit sphere, infinity stays infinity."""
+    return np.where(np.isinf(chords), np.inf, 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chords / 2, 0.0, 1.0)))
+
+
+class StopIndex:
+    """A k-d tree over stop positions, distances are great-circle kilometers."""
+
+    def __init__(self, lats: Sequence[float], lons: Sequence[float]):
+        """
+        Build the tree.
+
+        :param lats: Latitude of every stop in degrees.
+        :param lons: Longitude of every stop in degrees.
+        """
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self.tree = cKDTree(unit_vectors(self.lats, self.lons))
+
+    @staticmethod
+    def from_stops(stops: Sequence[Located]) -> StopIndex:
+        """
+        Index stop objects, results refer to their position in the sequence.
+
+        :param stops: The stops to index.
+        :returns index: The index.
+        """
+        return StopIndex([stop.lat for stop in stops], [stop.lon for stop in stops])
+
+    @staticmethod
+    def from_feed(feed: GtfsFeed) -> StopIndex:
+        """
+        Index the stops of a feed, results are stop codes.
+
+        :param feed: The feed to index.
+        :returns index: The index.
+        """
+        return StopIndex(feed.stops["lat"], feed.stops["lon"])
+
+    def __len__(self) -> int:
+        return len(self.lats)
+
+    def nearest(self, lat, lon, k: int = 1, max_km: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the nearest stops of one or many positions.
+
+        :param lat: Latitude in degrees, a scalar or an array.
+        :param lon: Longitude in degrees, a scalar or an array.
+        :param k: The number of stops to find per position.
+        :param max_km: Ignore stops farther away than this.
+        :returns result: The distances in kilometers and the stop indices, shaped like ``cKDTree.query``.
+            Missing neighbours have an infinite distance and the index ``len(self)``.
+        """
+        bound = np.inf if max_km is None else _chord(max_km)
+        chords, indices = self.tree.query(unit_vectors(lat, lon), k=k, distance_upper_bound=bound)
+
+        return _kilometers(np.asarray(chords)), indices
+
+    def within(self, lat, lon, radius_km: float) -> List[np.ndarray]:
+        """
+        Find all stops in a radius around positions.
+
+        :param lat: Latitudes in degrees.
+        :param lon: Longitudes in degrees.
+        :param radius_km: The radius in kilometers.
+        :returns indices: The sorted stop indices for every position.
+        """
+        points = np.atleast_2d(unit_vectors(lat, lon))
+
+        return [np.sort(np.asarray(found, dtype=np.int64)) for found in self.tree.query_ball_point(points, _chord(radius_km))]
+
+    def pairs(self, radius_km: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Find all pairs of stops closer than a radius, e.g. for walking transfers.
+
+        :param radius_km: The radius in kilometers.
+        :returns pairs: The first indices, the second indices and the distances in kilometers, every
+            pair appears once with the smaller index first.
+        """
+        found = self.tree.query_pairs(_chord(radius_km), output_type="ndarray")
+
+        if len(found) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0)
+
+        first, second = found[:, 0], found[:, 1]
+
+        return first, second, haversine(self.lats[first], self.lons[first], self.lats[second], self.lons[second])
+
+    def distances_to(self, lat: float, lon: float) -> np.ndarray:
+        """
+        Get the distances of all stops to one position, e.g. a heuristic table towards a goal.
+
+        :param lat: Latitude in degrees.
+        :param lon: Longitude in degrees.
+        :returns distances: The distance of every stop in kilometers.
+        """
+        return haversine(self.lats, self.lons, lat, lon)
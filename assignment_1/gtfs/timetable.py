@@ -0,0 +1,250 @@
+"""Time-dependent journey planning with the connection scan algorithm."""
+
+from __future__ import annotations
+import bisect
+import math
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+import numpy as np
+from .loader import NO_TIME, GtfsFeed
+from .service_calendar import ServiceCalendar
+
+MIN_CHANGE_SECONDS = 120
+"""Default time needed to change trips at a station."""
+
+
+@dataclass(frozen=True)
+class Leg:
+    """A ride on one trip, stops are GTFS ids and times seconds after midnight."""
+
+    trip_id: str
+    from_stop_id: str
+    to_stop_id: str
+    departure: int
+    arrival: int
+
+
+@dataclass(frozen=True)
+class Journey:
+    """The legs of a journey, changes happen between consecutive legs."""
+
+    legs: Tuple[Leg, ...]
+
+    @property
+    def departure(self) -> int:
+        return self.legs[0].departure
+
+    @property
+    def arrival(self) -> int:
+        return self.legs[-1].arrival
+
+    @property
+    def changes(self) -> int:
+        return len(self.legs) - 1
+
+
+class Timetable:
+    """
+    The connections of one service day, sorted by departure time.
+
+    A connection is a ride of a trip between two consecutive stops. Routing works on stations:
+    platforms with a parent station are merged into it, changing trips at a station needs
+    ``min_change_seconds``. Trips running past midnight count towards the day they started on.
+    """
+
+    def __init__(
+        self,
+        feed: GtfsFeed,
+        date: Optional[int] = None,
+        min_change_seconds: int = MIN_CHANGE_SECONDS,
+        calendar: Optional[ServiceCalendar] = None,
+    ):
+        """
+        Collect and sort the connections.
+
+        :param feed: The feed to plan journeys on.
+        :param date: The service day in the form YYYYMMDD, every trip runs if omitted.
+        :param min_change_seconds: The time needed to change trips at a station.
+        :param calendar: The compiled calendar of the feed, to share it between the timetables of several days.
+        """
+        self.feed = feed
+        self.date = date
+        self.min_change_seconds = min_change_seconds
+
+        parents = feed.stops["parent"]
+        self.stations = np.where(parents >= 0, parents, np.arange(len(parents))).astype(np.int32)
+
+        hops = feed.hops()
+        keep = (hops["departure"] != NO_TIME) & (hops["arrival"] != NO_TIME)
+
+        if date is not None:
+            calendar = calendar if calendar is not None else ServiceCalendar.from_feed(feed)
+            keep &= calendar.active_trips(date)[hops["trip"]]
+
+        order = np.argsort(hops["departure"][keep], kind="stable")
+
+        self.trips = np.asarray(hops["trip"][keep][order], dtype=np.int32)
+        self.from_stops = np.asarray(hops["from_stop"][keep][order], dtype=np.int32)
+        self.to_stops = np.asarray(hops["to_stop"][keep][order], dtype=np.int32)
+        self.departures = np.asarray(hops["departure"][keep][order], dtype=np.int32)
+        self.arrivals = np.asarray(hops["arrival"][keep][order], dtype=np.int32)
+
+        # Python lists are much faster than NumPy arrays in the element-wise scan loops
+        self._trips = self.trips.tolist()
+        self._from_stations = self.stations[self.from_stops].tolist()
+        self._to_stations = self.stations[self.to_stops].tolist()
+        self._departures = self.departures.tolist()
+        self._arrivals = self.arrivals.tolist()
+
+    def __len__(self) -> int:
+        return len(self._departures)
+
+    def station(self, stop_id: str) -> int:
+        """
+        Get the station of a stop.
+
+        :param stop_id: The GTFS id of a stop or station.
+        :returns station: The stop code of the station.
+        :raises KeyError: If the stop does not exist.
+        """
+        return int(self.stations[self.feed.stop_code(stop_id)])
+
+    def earliest_arrival(self, source_id: str, target_id: str, departure: int) -> Optional[Journey]:
+        """
+        Find the journey that arrives first, leaving the source no earlier than ``departure``.
+
+        :param source_id: The GTFS id of the stop to start at.
+        :param target_id: The GTFS id of the stop to travel to.
+        :param departure: The earliest departure in seconds after midnight.
+        :returns journey: The fastest journey or None if the target can not be reached on this day.
+        :raises KeyError: If a stop does not exist.
+        """
+        source, target = self.station(source_id), self.station(target_id)
+
+        if source == target:
+            return None
+
+        trips, from_stations, to_stations = self._trips, self._from_stations, self._to_stations
+        departures, arrivals = self._departures, self._arrivals
+        change = self.min_change_seconds
+
+        arrival = {source: departure}
+        # The time a trip can be boarded at a station, which includes the change time except at the source
+        ready = {source: departure}
+        boarded = {}
+        reached_by = {}
+        best = math.inf
+
+        for index in range(bisect.bisect_left(departures, departure), len(departures)):
+            if departures[index] >= best:
+                break
+
+            trip = trips[index]
+
+            if trip not in boarded:
+                if ready.get(from_stations[index], math.inf) > departures[index]:
+                    continue
+
+                boarded[trip] = index
+
+            station = to_stations[index]
+
+            if arrivals[index] < arrival.get(station, math.inf):
+                arrival[station] = arrivals[index]
+                ready[station] = arrivals[index] + change
+                reached_by[station] = (boarded[trip], index)
+
+                if station == target:
+                    best = arrivals[index]
+
+        if target not in reached_by:
+            return None
+
+        legs = []
+        station = target
+
+        while station != source:
+            first, last = reached_by[station]
+            legs.append(self._leg(first, last))
+            station = from_stations[first]
+
+        return Journey(tuple(reversed(legs)))
+
+    def profile(self, source_id: str, target_id: str, earliest: int = 0, latest: int = 48 * 3600) -> List[Tuple[int, int]]:
+        """
+        Find all journeys worth taking in a time window, for "when do I have to leave" questions.
+
+        A journey is worth taking if no other journey leaves later and arrives no later.
+
+        :param source_id: The GTFS id of the stop to start at.
+        :param target_id: The GTFS id of the stop to travel to.
+        :param earliest: The earliest departure in seconds after midnight.
+        :param latest: The latest departure in seconds after midnight.
+        :returns journeys: The (departure, arrival) pairs, ordered by departure.
+        :raises KeyError: If a stop does not exist.
+        """
+        source, target = self.station(source_id), self.station(target_id)
+
+        if source == target:
+            return []
+
+        trips, from_stations, to_stations = self._trips, self._from_stations, self._to_stations
+        departures, arrivals = self._departures, self._arrivals
+        change = self.min_change_seconds
+
+        # Per station the Pareto optimal (departure, arrival) pairs, appended with falling
+        # departures and therefore falling arrivals, departures are stored negated for bisect
+        profile_departures: dict = {}
+        profile_arrivals: dict = {}
+        trip_arrival: dict = {}
+
+        start = bisect.bisect_left(departures, earliest)
+
+        for index in range(len(departures) - 1, start - 1, -1):
+            station = to_stations[index]
+
+            if station == target:
+                best = arrivals[index]
+            else:
+                best = trip_arrival.get(trips[index], math.inf)
+                negated = profile_departures.get(station)
+
+                if negated:
+                    # The pair with the earliest departure after changing has the earliest arrival
+                    position = bisect.bisect_right(negated, -(arrivals[index] + change)) - 1
+
+                    if position >= 0 and profile_arrivals[station][position] < best:
+                        best = profile_arrivals[station][position]
+
+            if best == math.inf:
+                continue
+
+            if best < trip_arrival.get(trips[index], math.inf):
+                trip_arrival[trips[index]] = best
+
+            station = from_stations[index]
+            negated = profile_departures.setdefault(station, [])
+            station_arrivals = profile_arrivals.setdefault(station, [])
+
+            if not station_arrivals or best < station_arrivals[-1]:
+                if negated and negated[-1] == -departures[index]:
+                    station_arrivals[-1] = best
+                else:
+                    negated.append(-departures[index])
+                    station_arrivals.append(best)
+
+        pairs = zip(profile_departures.get(source, []), profile_arrivals.get(source, []))
+
+        return sorted((-negated, arrival) for negated, arrival in pairs if -negated <= latest)
+
+    def _leg(self, first: int, last: int) -> Leg:
+        """The ride on one trip from connection ``first`` to connection ``last``."""
+        feed = self.feed
+
+        return Leg(
+            trip_id=str(feed.trip_ids[self._trips[first]]),
+            from_stop_id=str(feed.stop_ids[self.from_stops[first]]),
+            to_stop_id=str(feed.stop_ids[self.to_stops[last]]),
+            departure=self._departures[first],
+            arrival=self._arrivals[last],
+        )
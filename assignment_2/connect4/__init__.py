@@ -1,6 +1,28 @@
 """Connect4 game."""
 
 from .types import Player, BoardType
-from .engine import Connect4GameEngine
+from .bitboard import BitBoard
+from .cache import Bound, HashedBoard, TranspositionTable, ZobristHasher
+from .search import SearchDriver
 
-__all__ = ["Player", "Connect4GameEngine", "BoardType"]
+__all__ = [
+    "Player",
+    "Connect4GameEngine",
+    "BoardType",
+    "BitBoard",
+    "Bound",
+    "HashedBoard",
+    "TranspositionTable",
+    "ZobristHasher",
+    "SearchDriver",
+]
+
+
+def __getattr__(name: str):
+    """Import the engine on first use, so headless code does not pay for importing ipywidgets."""
+    if name == "Connect4GameEngine":
+        from .engine import Connect4GameEngine
+
+        return Connect4GameEngine
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,200 @@
+"""Bitboard implementation of the game board."""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from functools import cached_property
+from typing import List, Optional
+from .types import BoardType, Player
+
+GRID_ROWS = 6
+GRID_COLUMNS = 7
+
+
+@dataclass(frozen=True)
+class BitBoard(BoardType):
+    """
+    A compact game board backed by two integer bitboards.
+
+    Every column uses ``rows + 1`` bits, the lowest bit being the bottom cell and the highest one
+    an always empty sentinel that stops wins from wrapping around into the next column.
+    Player slot 0 belongs to whoever dropped the first disc.
+    """
+
+    rows: int = GRID_ROWS
+    columns: int = GRID_COLUMNS
+    boards: tuple[int, int] = (0, 0)
+    heights: tuple[int, ...] = ()
+    players: tuple[Optional[Player], Optional[Player]] = (None, None)
+    moves: int = 0
+
+    def __post_init__(self) -> None:
+        """Fill in the column heights of an empty board."""
+        if not self.heights:
+            object.__setattr__(self, "heights", (0,) * self.columns)
+
+    @staticmethod
+    def from_grid(grid: List[List[Optional[Player]]], first: Optional[Player] = None) -> BitBoard:
+        """
+        Create a board from a grid, where the first row is the top of the board.
+
+        :param grid: The grid to convert.
+        :param first: The player who made the first move, guessed from the disc count if omitted.
+        :returns board: The created board.
+        :raises ValueError: If the grid contains floating discs or more than two players.
+        """
+        rows, columns = len(grid), len(grid[0])
+        counts: dict[Player, int] = {}
+
+        for row in reversed(grid):
+            for cell in row:
+                if cell is not None:
+                    counts[cell] = counts.get(cell, 0) + 1
+
+        if len(counts) > 2:
+            raise ValueError("A board can only hold discs of two players.")
+
+        players = sorted(counts, key=lambda player: (player != first, -counts[player]))
+        slots = (players + [None, None])[:2]
+
+        boards = [0, 0]
+        heights = [0] * columns
+
+        for column in range(columns):
+            for height in range(rows):
+                cell = grid[rows - 1 - height][column]
+
+                if cell is None:
+                    continue
+
+                if heights[column] != height:
+                    raise ValueError(f"Floating disc in column '{column}'.")
+
+                boards[slots.index(cell)] |= 1 << (column * (rows + 1) + height)
+                heights[column] += 1
+
+        return BitBoard(
+            rows=rows,
+            columns=columns,
+            boards=(boards[0], boards[1]),
+            heights=tuple(heights),
+            players=(slots[0], slots[1]),
+            moves=sum(heights),
+        )
+
+    @cached_property
+    def grid(self) -> List[List[Optional[Player]]]:
+        """The board as grid, where the first row is the top of the board."""
+        grid: List[List[Optional[Player]]] = [[None] * self.columns for _ in range(self.rows)]
+
+        for slot, board in enumerate(self.boards):
+            for column in range(self.columns):
+                for height in range(self.heights[column]):
+                    if board >> (column * (self.rows + 1) + height) & 1:
+                        grid[self.rows - 1 - height][column] = self.players[slot]
+
+        return grid
+
+    @property
+    def mask(self) -> int:
+        """Bitboard of all occupied cells."""
+        return self.boards[0] | self.boards[1]
+
+    def slot_of(self, player: Player) -> Optional[int]:
+        """
+        Get the bitboard slot of the given player.
+
+        :param player: The player to look up.
+        :returns slot: The slot or None if the player has not dropped a disc yet.
+        """
+        # identity first, so two equal but distinct players still get their own slots,
+        # equality only once both slots are taken, e.g. for copies made by pickling
+        if self.players[0] is player:
+            return 0
+
+        if self.players[1] is player:
+            return 1
+
+        if None in self.players:
+            return None
+
+        if self.players[0] == player:
+            return 0
+
+        if self.players[1] == player:
+            return 1
+
+        return None
+
+    def drop_in_column(self, player: Player, column: int) -> BitBoard:
+        """
+        Drop a disc for the given player in the given column.
+
+        :param player: The player who should drop a disk.
+        :param column: The column in which to drop a disk.
+        :returns board: The resulting board.
+        :raises ValueError: If the column is full or a third player tries to move.
+        """
+        if not 0 <= column < self.columns or self.heights[column] >= self.rows:
+            raise ValueError(f"Could not drop in '{column}' for '{player.name}', is it full?")
+
+        players = self.players
+        slot = self.slot_of(player)
+
+        if slot is None:
+            if players[0] is None:
+                slot, players = 0, (player, players[1])
+            elif players[1] is None:
+                slot, players = 1, (players[0], player)
+            else:
+                raise ValueError(f"'{player.name}' is not playing on this board.")
+
+        height = self.heights[column]
+        bit = 1 << (column * (self.rows + 1) + height)
+        boards = (self.boards[0] | bit, self.boards[1]) if slot == 0 else (self.boards[0], self.boards[1] | bit)
+
+        return BitBoard(
+            rows=self.rows,
+            columns=self.columns,
+            boards=boards,
+            heights=self.heights[:column] + (height + 1,) + self.heights[column + 1:],
+            players=players,
+            moves=self.moves + 1,
+        )
+
+    def valid_moves(self) -> List[int]:
+        """
+        Get all columns in which a disc can be dropped.
+
+        :returns valid_moves: columns in which a disc can be dropped.
+        """
+        return [column for column, height in enumerate(self.heights) if height < self.rows]
+
+    def get_winner(self) -> Optional[Player]:
+        """
+        Get the currently winning player.
+
+        :returns winner: The currently winning player or None if there is no winner (game not over / tie).
+        """
+        for slot, board in enumerate(self.boards):
+            if has_four(board, self.rows):
+                return self.players[slot]
+
+        return None
+
+
+def has_four(board: int, rows: int = GRID_ROWS) -> bool:
+    """
+    Check whether a single bitboard contains four connected discs.
+
+    :param board: The bitboard of one player.
+    :param rows: The number of rows of the board.
+    :returns won: If there are four connected discs.
+    """
+    # vertical, horizontal and both diagonals
+    for shift in (1, rows + 1, rows, rows + 2):
+        pairs = board & (board >> shift)
+
+        if pairs & (pairs >> (2 * shift)):
+            return True
+
+    return False
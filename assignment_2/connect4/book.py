@@ -0,0 +1,250 @@
+"""Opening book stored in a compact, memory-mapped binary file."""
+
+from __future__ import annotations
+import argparse
+import mmap
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from .bitboard import GRID_COLUMNS, GRID_ROWS, BitBoard
+from .search import Evaluation, best_move, evaluate
+from .types import BoardType, Player
+
+MAGIC = b"C4BK"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHBBI")
+"""Magic, version, rows, columns and number of records."""
+
+RECORD = struct.Struct("<QB")
+"""Canonical position key and best move, sorted by key."""
+
+
+def position_key(board: BoardType, player: Player) -> int:
+    """
+    Get a key that identifies a position together with the player to move.
+
+    The key is the bitboard of the player to move plus the bitboard of all discs, which is unique
+    because every column uses one bit more than it has rows.
+
+    :param board: The board to get the key for.
+    :param player: The player to move.
+    :returns key: The key of the position.
+    """
+    if isinstance(board, BitBoard):
+        slot = board.slot_of(player)
+        own = 0 if slot is None else board.boards[slot]
+
+        return own + board.mask
+
+    grid = board.grid
+    rows = len(grid)
+    own = mask = 0
+
+    for row_index, row in enumerate(grid):
+        for column, cell in enumerate(row):
+            if cell is not None:
+                bit = 1 << (column * (rows + 1) + rows - 1 - row_index)
+                mask |= bit
+
+                if cell is player or cell == player:
+                    own |= bit
+
+    return own + mask
+
+
+def mirror_key(key: int, rows: int = GRID_ROWS, columns: int = GRID_COLUMNS) -> int:
+    """
+    Mirror a position key from left to right.
+
+    :param key: The key to mirror.
+    :param rows: The number of rows of the board.
+    :param columns: The number of columns of the board.
+    :returns key: The key of the mirrored position.
+    """
+    height = rows + 1
+    column_mask = (1 << height) - 1
+    mirrored = 0
+
+    for column in range(columns):
+        mirrored |= ((key >> (column * height)) & column_mask) << ((columns - 1 - column) * height)
+
+    return mirrored
+
+
+def canonical_key(key: int, rows: int = GRID_ROWS, columns: int = GRID_COLUMNS) -> Tuple[int, bool]:
+    """
+    Fold a position key and its mirror image into one key.
+
+    :param key: The key of the position.
+    :param rows: The number of rows of the board.
+    :param columns: The number of columns of the board.
+    :returns result: The canonical key and whether it belongs to the mirrored position.
+    """
+    mirrored = mirror_key(key, rows, columns)
+
+    return (mirrored, True) if mirrored < key else (key, False)
+
+
+class OpeningBook:
+    """A read-only opening book, the file is memory-mapped and searched with binary search."""
+
+    def __init__(self, path: Path | str):
+        """
+        Open a book file.
+
+        :param path: The path of the book.
+        :raises ValueError: If the file is not a valid book.
+        """
+        self.path = Path(path)
+        self._open()
+
+    def _open(self) -> None:
+        """Map the file into memory and read its header."""
+        with open(self.path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._map) < HEADER.size:
+            raise ValueError(f"'{self.path}' is not an opening book.")
+
+        magic, version, self.rows, self.columns, self._count = HEADER.unpack_from(self._map)
+
+        if magic != MAGIC or version != VERSION or len(self._map) != HEADER.size + self._count * RECORD.size:
+            raise ValueError(f"'{self.path}' is not an opening book of version {VERSION}.")
+
+    def __len__(self) -> int:
+        """The number of positions in the book."""
+        return self._count
+
+    def __getstate__(self) -> dict:
+        """Pickle the path only, the file is mapped again when unpickled."""
+        return {"path": self.path}
+
+    def __setstate__(self, state: dict) -> None:
+        """Map the file again after unpickling."""
+        self.path = state["path"]
+        self._open()
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._map.close()
+
+    def lookup(self, board: BoardType, player: Player) -> Optional[int]:
+        """
+        Look up the best move of a position.
+
+        :param board: The current game board.
+        :param player: The player to move.
+        :returns column: The best column or None if the position is not in the book.
+        """
+        grid = board.grid
+
+        if (len(grid), len(grid[0])) != (self.rows, self.columns):
+            return None
+
+        key, mirrored = canonical_key(position_key(board, player), self.rows, self.columns)
+        low, high = 0, self._count
+
+        while low < high:
+            middle = (low + high) // 2
+            middle_key, move = RECORD.unpack_from(self._map, HEADER.size + middle * RECORD.size)
+
+            if middle_key < key:
+                low = middle + 1
+            elif middle_key > key:
+                high = middle
+            else:
+                return self.columns - 1 - move if mirrored else move
+
+        return None
+
+
+def write_book(path: Path | str, moves: Dict[int, int], rows: int = GRID_ROWS, columns: int = GRID_COLUMNS) -> None:
+    """
+    Write a book file.
+
+    :param path: The path to write to.
+    :param moves: The best move of every canonical position key.
+    :param rows: The number of rows of the board.
+    :param columns: The number of columns of the board.
+    """
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, rows, columns, len(moves)))
+
+        for key in sorted(moves):
+            file.write(RECORD.pack(key, moves[key]))
+
+
+def generate_book(
+    path: Path | str,
+    plies: int = 6,
+    depth: int = 8,
+    evaluate: Evaluation = evaluate,
+    rows: int = GRID_ROWS,
+    columns: int = GRID_COLUMNS,
+    workers: Optional[int] = None,
+) -> int:
+    """
+    Fill a book by searching every position reachable in the first plies.
+
+    :param path: The path to write the book to.
+    :param plies: Positions with less discs than this are stored.
+    :param depth: The depth every position is searched to.
+    :param evaluate: Scores the positions at the search horizon, must be picklable.
+    :param rows: The number of rows of the board.
+    :param columns: The number of columns of the board.
+    :param workers: The number of processes to search with, all cores if omitted.
+    :returns count: The number of positions in the book.
+    """
+    players = (Player.human("first"), Player.human("second"))
+    positions: Dict[int, Tuple[BitBoard, bool]] = {}
+    layer = [BitBoard(rows=rows, columns=columns)]
+
+    for ply in range(plies):
+        player = players[ply % 2]
+        next_layer: List[BitBoard] = []
+
+        for board in layer:
+            key, mirrored = canonical_key(position_key(board, player), rows, columns)
+
+            if key in positions or board.get_winner() is not None or not board.valid_moves():
+                continue
+
+            positions[key] = (board, mirrored)
+            next_layer.extend(board.drop_in_column(player, column) for column in board.valid_moves())
+
+        layer = next_layer
+
+    tasks = [(board, players[board.moves % 2], players[(board.moves + 1) % 2], depth, evaluate) for board, _ in positions.values()]
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        results = list(executor.map(_search, tasks, chunksize=16))
+
+    moves = {
+        key: columns - 1 - move if mirrored else move
+        for (key, (_, mirrored)), move in zip(positions.items(), results)
+    }
+    write_book(path, moves, rows, columns)
+
+    return len(moves)
+
+
+def _search(task: Tuple[BitBoard, Player, Player, int, Evaluation]) -> int:
+    """Search the best move of a single book position."""
+    board, player, opponent, depth, evaluate = task
+
+    return best_move(board, player, opponent, depth, evaluate)[0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a Connect4 opening book.")
+    parser.add_argument("path", type=Path, help="the file to write the book to")
+    parser.add_argument("--plies", type=int, default=6, help="store positions with less discs than this")
+    parser.add_argument("--depth", type=int, default=8, help="search depth for every position")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes, all cores by default")
+    arguments = parser.parse_args()
+
+    count = generate_book(arguments.path, plies=arguments.plies, depth=arguments.depth, workers=arguments.workers)
+    print(f"Wrote {count} positions to '{arguments.path}'.")
@@ -0,0 +1,260 @@
+"""Zobrist hashing and transposition table for searching game trees."""
+
+from __future__ import annotations
+from array import array
+from dataclasses import dataclass
+from enum import IntEnum
+from random import Random
+from typing import List, Optional
+from .types import BoardType, Player
+
+ENTRY_BYTES = 15
+"""Bytes used per table entry: key (8), score (4), depth (1), bound (1) and move (1)."""
+
+
+class Bound(IntEnum):
+    """How a stored score relates to the real value of a position."""
+
+    EXACT = 1
+    LOWER = 2
+    UPPER = 3
+
+
+@dataclass(frozen=True)
+class TableEntry:
+    """A search result stored in the transposition table."""
+
+    key: int
+    score: int
+    depth: int
+    bound: Bound
+    move: Optional[int]
+
+
+class ZobristHasher:
+    """Random 64-bit keys for every (player slot, column, height) a disc can occupy."""
+
+    def __init__(self, rows: int = 6, columns: int = 7, seed: int = 2025):
+        """
+        Initialize.
+
+        :param rows: The number of rows of the boards to hash.
+        :param columns: The number of columns of the boards to hash.
+        :param seed: The seed for generating the keys, equal seeds produce equal hashes.
+        """
+        random = Random(seed)
+
+        self.rows = rows
+        self.columns = columns
+        self._keys = [
+            [[random.getrandbits(64) for _ in range(rows)] for _ in range(columns)]
+            for _ in range(2)
+        ]
+
+    def piece(self, slot: int, column: int, height: int) -> int:
+        """
+        Get the key of a single disc.
+
+        :param slot: The slot (0 or 1) of the player owning the disc.
+        :param column: The column of the disc.
+        :param height: The height of the disc, counted from the bottom.
+        :returns key: The key to xor into the hash.
+        """
+        return self._keys[slot][column][height]
+
+    def hash_grid(self, grid: List[List[Optional[Player]]], players: tuple[Player, Player]) -> int:
+        """
+        Hash a whole grid from scratch.
+
+        :param grid: The grid to hash, the first row is the top of the board.
+        :param players: The players, their index is used as slot.
+        :returns key: The hash of the grid.
+        """
+        key = 0
+
+        for row_index, row in enumerate(grid):
+            for column, cell in enumerate(row):
+                if cell is not None:
+                    key ^= self.piece(_slot(players, cell), column, len(grid) - 1 - row_index)
+
+        return key
+
+
+@dataclass(frozen=True)
+class HashedBoard(BoardType):
+    """Wraps any board and keeps its Zobrist hash up to date on every drop."""
+
+    board: BoardType
+    players: tuple[Player, Player]
+    hasher: ZobristHasher
+    key: int
+
+    @staticmethod
+    def wrap(board: BoardType, players: tuple[Player, Player], hasher: Optional[ZobristHasher] = None) -> HashedBoard:
+        """
+        Hash the given board once, further drops update the hash incrementally.
+
+        :param board: The board to wrap.
+        :param players: The players, their index is used as slot.
+        :param hasher: The hasher to use, a default one for the board size is created if omitted.
+        :returns board: The wrapped board.
+        """
+        if hasher is None:
+            hasher = ZobristHasher(rows=len(board.grid), columns=len(board.grid[0]))
+
+        return HashedBoard(board=board, players=players, hasher=hasher, key=hasher.hash_grid(board.grid, players))
+
+    @property
+    def grid(self) -> List[List[Optional[Player]]]:  # type: ignore[override]
+        """The grid of the wrapped board."""
+        return self.board.grid
+
+    def drop_in_column(self, player: Player, column: int) -> HashedBoard:
+        """
+        Drop a disc for the given player in the given column.
+
+        :param player: The player who should drop a disk.
+        :param column: The column in which to drop a disk.
+        :returns board: The resulting board.
+        """
+        heights = getattr(self.board, "heights", None)
+
+        if heights is not None:
+            height = heights[column]
+        else:
+            grid = self.board.grid
+            height = sum(1 for row in grid if row[column] is not None)
+
+        board = self.board.drop_in_column(player=player, column=column)
+
+        return HashedBoard(
+            board=board,
+            players=self.players,
+            hasher=self.hasher,
+            key=self.key ^ self.hasher.piece(_slot(self.players, player), column, height),
+        )
+
+    def valid_moves(self) -> List[int]:
+        """
+        Get all columns in which a disc can be dropped.
+
+        :returns valid_moves: columns in which a disc can be dropped.
+        """
+        return self.board.valid_moves()
+
+    def get_winner(self) -> Optional[Player]:
+        """
+        Get the currently winning player.
+
+        :returns winner: The currently winning player or None if there is no winner (game not over / tie).
+        """
+        return self.board.get_winner()
+
+
+class TranspositionTable:
+    """
+    A fixed size hash table of search results.
+
+    Entries are stored in flat arrays and indexed by ``key % capacity``. When two positions share a
+    slot, the result of the deeper search is kept.
+    """
+
+    def __init__(self, size_mb: float = 16):
+        """
+        Initialize.
+
+        :param size_mb: The memory the table may use in megabytes.
+        """
+        self.capacity = max(1, int(size_mb * 2**20) // ENTRY_BYTES)
+
+        self._keys = array("Q", [0]) * self.capacity
+        self._scores = array("i", [0]) * self.capacity
+        self._depths = array("B", [0]) * self.capacity
+        self._bounds = array("B", [0]) * self.capacity
+        self._moves = array("b", [-1]) * self.capacity
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._used = 0
+
+    def __len__(self) -> int:
+        """The number of occupied slots."""
+        return self._used
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of probes that found an entry."""
+        probes = self.hits + self.misses
+
+        return self.hits / probes if probes else 0.0
+
+    def probe(self, key: int) -> Optional[TableEntry]:
+        """
+        Look up the search result of a position.
+
+        :param key: The hash of the position.
+        :returns entry: The stored entry or None if the position is unknown.
+        """
+        index = key % self.capacity
+
+        if self._bounds[index] and self._keys[index] == key:
+            self.hits += 1
+            move = self._moves[index]
+
+            return TableEntry(
+                key=key,
+                score=self._scores[index],
+                depth=self._depths[index],
+                bound=Bound(self._bounds[index]),
+                move=None if move < 0 else move,
+            )
+
+        self.misses += 1
+        return None
+
+    def store(self, key: int, score: int, depth: int, bound: Bound, move: Optional[int] = None) -> bool:
+        """
+        Store the search result of a position, unless a deeper result occupies its slot.
+
+        :param key: The hash of the position.
+        :param score: The score of the position.
+        :param depth: The depth the position was searched to.
+        :param bound: Whether the score is exact or a lower / upper bound.
+        :param move: The best move found, if any.
+        :returns stored: If the result was stored.
+        """
+        index = key % self.capacity
+
+        if self._bounds[index]:
+            if self._depths[index] > depth:
+                return False
+
+            if self._keys[index] != key:
+                self.evictions += 1
+        else:
+            self._used += 1
+
+        self._keys[index] = key
+        self._scores[index] = score
+        self._depths[index] = depth
+        self._bounds[index] = bound
+        self._moves[index] = -1 if move is None else move
+
+        return True
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        self._bounds = array("B", [0]) * self.capacity
+        self.hits = self.misses = self.evictions = self._used = 0
+
+
+def _slot(players: tuple[Player, Player], player: Player) -> int:
+    """Get the slot of a player, preferring identity over equality."""
+    if players[0] is player:
+        return 0
+
+    if players[1] is player:
+        return 1
+
+    return players.index(player)
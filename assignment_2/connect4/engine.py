@@ -1,7 +1,13 @@
 """Game engine."""
 
 from __future__ import annotations
-from time import sleep
+import asyncio
+import io
+import sys
+import threading
+from contextlib import contextmanager
+from time import monotonic, perf_counter, sleep
+from typing import Callable, Dict, Iterator, List, Optional
 from connect4.const import (
     HEADER_CONTENT,
     OVER_MESSAGE_CONTENT,
@@ -14,13 +20,88 @@ from IPython.display import display, clear_output
 import ipywidgets as widgets
 
 
+class _ThreadStdout(io.TextIOBase):
+    """Stands in for ``sys.stdout``, collects what the registered threads print and passes on everything else."""
+
+    def __init__(self, stream):
+        """Initialize."""
+        self.stream = stream
+        self.buffers: Dict[int, io.StringIO] = {}
+
+    def write(self, text: str) -> int:
+        """Write to the buffer of the current thread, or the original stream."""
+        return self.buffers.get(threading.get_ident(), self.stream).write(text)
+
+    @property
+    def encoding(self) -> str:  # type: ignore[override]
+        """The encoding of the original stream."""
+        return getattr(self.stream, "encoding", "utf-8")
+
+    def flush(self) -> None:
+        """Flush the original stream."""
+        self.stream.flush()
+
+
+_stdout_lock = threading.Lock()
+
+
+@contextmanager
+def _captured_stdout() -> Iterator[io.StringIO]:
+    """Collect what the current thread prints, other threads keep printing to ``sys.stdout``."""
+    buffer = io.StringIO()
+
+    with _stdout_lock:
+        if not isinstance(sys.stdout, _ThreadStdout):
+            sys.stdout = _ThreadStdout(sys.stdout)
+
+        proxy = sys.stdout
+        proxy.buffers[threading.get_ident()] = buffer
+
+    try:
+        yield buffer
+    finally:
+        with _stdout_lock:
+            del proxy.buffers[threading.get_ident()]
+
+            if not proxy.buffers and sys.stdout is proxy:
+                sys.stdout = proxy.stream
+
+
 class Connect4GameEngine:
     """The game engine."""
 
-    def __init__(self, board: BoardType, player0: Player, player1: Player):
-        """Initialize."""
+    def __init__(
+        self,
+        board: BoardType,
+        player0: Player,
+        player1: Player,
+        min_frame_interval: float = 0.0,
+        incremental_rendering: bool = True,
+    ):
+        """
+        Initialize.
+
+        :param board: The board to start with.
+        :param player0: The player who moves first.
+        :param player1: The player who moves second.
+        :param min_frame_interval: The minimum seconds between two rendered AI moves, so fast
+            AI vs. AI games stay watchable.
+        :param incremental_rendering: Build the widgets once and only update the changed cells,
+            instead of rebuilding the whole board on every move.
+        """
         self._rows = len(board.grid)
         self._columns = len(board.grid[0])
+        self._min_frame_interval = min_frame_interval
+        self._last_frame = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._human_moved: Optional[asyncio.Event] = None
+        self._incremental_rendering = incremental_rendering
+        self._header: Optional[widgets.HTML] = None
+        self._cells: List[List[widgets.HTML]] = []
+        self._rendered: List[List[str]] = []
+
+        self.render_timings: List[float] = []
+        """Seconds spent in the kernel for every rendered frame."""
 
         self._log_output = widgets.Output()
         self._ui_output = widgets.Output()
@@ -39,16 +120,30 @@ class Connect4GameEngine:
             button.on_click(lambda _, i=i: self._move(self._current_player, i))
 
     def start(self) -> None:
-        """Start the game."""
+        """
+        Start the game.
+
+        Inside Jupyter the game is scheduled on the running event loop and this returns
+        immediately. Otherwise the AI moves are made right away until a human is to move,
+        the remaining moves follow the clicks of the human.
+        """
         self._render()
 
         display(self._log_output)
         display(self._ui_output)
 
         try:
-            self._next_move()
-        except KeyboardInterrupt:
-            pass  # ignore to allow stopping of AI vs. AI game
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._play_blocking()
+        else:
+            self._task = loop.create_task(self._play())
+            self._task.add_done_callback(self._on_done)
+
+    def stop(self) -> None:
+        """Stop a running game."""
+        if self._task is not None:
+            self._task.cancel()
 
     @property
     def _current_player(self) -> Player:
@@ -64,57 +159,141 @@ class Connect4GameEngine:
         :raises ValueError: If the move is impossible or the game is already over.
         """
         self._state = self._state.move(player, column)
-
         self._render()
-        self._next_move()
 
-    def _next_move(self) -> None:
-        """Run the next move."""
-        if not self._state.game_over and (next_move := self._current_player.next_move):
-            # If the students solution is too fast, we get race conditions when updating the ui
-            # via the Jupyter server, so we purposefully make the move calculation slower
-            sleep(2)
+        if self._human_moved is not None:
+            self._human_moved.set()
+        elif self._task is None:
+            self._play_blocking()
 
-            with self._log_output:
-                column = next_move(
-                    self._state.board,
-                    self._current_player,
-                    self._state.players[(self._state.current_player + 1) % 2]
-                )
+    async def _play(self) -> None:
+        """Run the game loop, AI moves are computed in a worker thread so the kernel stays responsive."""
+        loop = asyncio.get_running_loop()
+        self._human_moved = asyncio.Event()
+
+        while not self._state.game_over:
+            state = self._state
+            player = state.players[state.current_player]
+
+            if player.next_move is None:
+                self._human_moved.clear()
+                await self._human_moved.wait()
+                continue
+
+            column = await loop.run_in_executor(
+                None, self._compute_move, state, lambda text: loop.call_soon_threadsafe(self._log_output.append_stdout, text)
+            )
+
+            if (delay := self._last_frame + self._min_frame_interval - monotonic()) > 0:
+                await asyncio.sleep(delay)
+
+            self._state = state.move(player, column)
+            self._render()
+
+    def _play_blocking(self) -> None:
+        """Make the AI moves in this thread until the game is over or a human is to move."""
+        try:
+            while not self._state.game_over and self._current_player.next_move is not None:
+                state = self._state
+                column = self._compute_move(state, self._log_output.append_stdout)
+
+                if (delay := self._last_frame + self._min_frame_interval - monotonic()) > 0:
+                    sleep(delay)
+
+                self._state = state.move(state.players[state.current_player], column)
+                self._render()
+        except KeyboardInterrupt:
+            pass  # ignore to allow stopping of AI vs. AI game
+
+    def _compute_move(self, state: GameState, publish: Callable[[str], object]) -> int:
+        """
+        Ask the AI whose turn it is for its next move.
+
+        The output widget is not thread-safe, so what the AI prints is collected and handed to
+        ``publish``, which has to show it from the thread of the event loop.
+
+        :param state: The state to compute the move for.
+        :param publish: Receives the printed text, even if the AI raised an error.
+        :returns column: The column chosen by the AI.
+        """
+        player = state.players[state.current_player]
+        opponent = state.players[(state.current_player + 1) % 2]
 
-            self._move(self._current_player, column)
+        with _captured_stdout() as buffer:
+            try:
+                return player.next_move(state.board, player, opponent)  # type: ignore[misc]
+            finally:
+                if text := buffer.getvalue():
+                    publish(text)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        """Report errors that stopped the game loop."""
+        if not task.cancelled() and (error := task.exception()) is not None:
+            with self._log_output:
+                print(f"The game stopped: {error}")
 
     def _render(self) -> None:
         """Renders the current game state."""
-        with self._ui_output:
-            clear_output(wait=True)
-
-            player0, player1 = self._state.players
-            player0_icon, player1_icon = PLAYER_ICONS
+        start_time = perf_counter()
+        self._last_frame = monotonic()
 
-            over_message = ""
+        if self._incremental_rendering:
+            self._update_view()
+        else:
+            self._render_full()
 
-            if self._state.game_over:
-                if self._state.winner:
-                    over_text = f"{self._state.winner.name} wins!"
-                else:
-                    over_text = "It's a draw!"
+        self.render_timings.append(perf_counter() - start_time)
 
-                over_message = OVER_MESSAGE_CONTENT.format(text=over_text)
+    def _update_view(self) -> None:
+        """Update the widgets built by the first call in place, only changed values are sent to the frontend."""
+        if self._header is None:
+            self._header = widgets.HTML()
+            self._cells = [
+                [widgets.HTML(self._cell_html("")) for _ in range(self._columns)]
+                for _ in range(self._rows)
+            ]
+            self._rendered = [[""] * self._columns for _ in range(self._rows)]
 
-            display(
-                widgets.HTML(
-                    HEADER_CONTENT.format(
-                        over_message=over_message,
-                        player0_name=player0.name,
-                        player0_icon=player0_icon,
-                        player1_name=player1.name,
-                        player1_icon=player1_icon,
-                        turn=self._current_player.name,
-                    )
-                )
+            grid = widgets.GridspecLayout(
+                n_rows=self._rows + 1, n_columns=self._columns, width="fit-content"
             )
 
+            for button_index, button in enumerate(self._buttons):
+                grid[0, button_index] = button
+
+            for row_index, row in enumerate(self._cells):
+                for column_index, cell in enumerate(row):
+                    grid[row_index + 1, column_index] = cell
+
+            with self._ui_output:
+                clear_output(wait=True)
+                display(self._header)
+                display(grid)
+
+        if (header := self._header_html()) != self._header.value:
+            self._header.value = header
+
+        disabled = bool(self._state.game_over or self._current_player.next_move)
+
+        for button in self._buttons:
+            if button.disabled != disabled:
+                button.disabled = disabled
+
+        for row_index, row in enumerate(self._state.board.grid):
+            for column_index, column in enumerate(row):
+                text = self._cell_text(column)
+
+                if text != self._rendered[row_index][column_index]:
+                    self._cells[row_index][column_index].value = self._cell_html(text)
+                    self._rendered[row_index][column_index] = text
+
+    def _render_full(self) -> None:
+        """Rebuild and display all widgets."""
+        with self._ui_output:
+            clear_output(wait=True)
+
+            display(widgets.HTML(self._header_html()))
+
             grid = widgets.GridspecLayout(
                 n_rows=self._rows + 1, n_columns=self._columns, width="fit-content"
             )
@@ -128,16 +307,50 @@ class Connect4GameEngine:
 
             for row_index, row in enumerate(self._state.board.grid):
                 for column_index, column in enumerate(row):
-                    text = ""
-
-                    if column:
-                        if column is player0:
-                            text = player0_icon
-                        elif column is player1:
-                            text = player1_icon
-
                     grid[row_index + 1, column_index] = widgets.HTML(
-                        f"<div style='text-align: center'>{text}</div>"
+                        self._cell_html(self._cell_text(column))
                     )
 
             display(grid)
+
+    def _header_html(self) -> str:
+        """The header describing the players and the state of the game."""
+        player0, player1 = self._state.players
+        player0_icon, player1_icon = PLAYER_ICONS
+
+        over_message = ""
+
+        if self._state.game_over:
+            if self._state.winner:
+                over_text = f"{self._state.winner.name} wins!"
+            else:
+                over_text = "It's a draw!"
+
+            over_message = OVER_MESSAGE_CONTENT.format(text=over_text)
+
+        return HEADER_CONTENT.format(
+            over_message=over_message,
+            player0_name=player0.name,
+            player0_icon=player0_icon,
+            player1_name=player1.name,
+            player1_icon=player1_icon,
+            turn=self._current_player.name,
+        )
+
+    def _cell_text(self, cell: Optional[Player]) -> str:
+        """The icon of the player owning a cell."""
+        player0, player1 = self._state.players
+        player0_icon, player1_icon = PLAYER_ICONS
+
+        if cell:
+            if cell is player0:
+                return player0_icon
+            elif cell is player1:
+                return player1_icon
+
+        return ""
+
+    @staticmethod
+    def _cell_html(text: str) -> str:
+        """The html of a single cell."""
+        return f"<div style='text-align: center'>{text}</div>"
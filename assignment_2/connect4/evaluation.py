@@ -0,0 +1,205 @@
+"""Vectorised evaluation of many positions at once."""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from .bitboard import GRID_COLUMNS, GRID_ROWS, BitBoard
+from .search import WINDOW_SCORES
+from .types import BoardType, Player
+
+OWN = 1
+"""Cell of the player a position is scored for."""
+
+OTHER = -1
+"""Cell of the opponent."""
+
+EMPTY = 0
+"""Empty cell."""
+
+
+@dataclass(frozen=True)
+class BatchScores:
+    """The results of `evaluate_batch`, one entry per position."""
+
+    scores: np.ndarray
+    """The same scores as `search.evaluate`, won positions are scored like any other."""
+    winners: np.ndarray
+    """``OWN`` or ``OTHER`` if that player has four connected discs, otherwise ``EMPTY``."""
+    terminal: np.ndarray
+    """Whether the game is over, because a player won or the board is full."""
+
+
+@lru_cache(maxsize=None)
+def _score_table() -> np.ndarray:
+    """
+    Score of a window by its code, which is the number of own discs plus five times the number of other discs.
+
+    Windows holding discs of both players score nothing, as do windows of four connected discs.
+    """
+    table = np.zeros(21, dtype=np.int64)
+
+    for count in range(1, 4):
+        table[count] = WINDOW_SCORES[count]
+        table[5 * count] = -WINDOW_SCORES[count]
+
+    return table
+
+
+def window_codes(positions: np.ndarray) -> np.ndarray:
+    """
+    Encode every window of four cells, horizontal, vertical and both diagonals.
+
+    :param positions: A ``(N, rows, columns)`` array of ``OWN``, ``OTHER`` and ``EMPTY`` cells.
+    :returns codes: A ``(N, windows)`` array holding the number of own discs plus five times the
+        number of other discs of every window.
+    """
+    cells = (positions == OWN).astype(np.int8) + 5 * (positions == OTHER).astype(np.int8)
+    count = len(cells)
+
+    horizontal = sliding_window_view(cells, 4, axis=2).sum(axis=-1, dtype=np.int8)
+    vertical = sliding_window_view(cells, 4, axis=1).sum(axis=-1, dtype=np.int8)
+    squares = sliding_window_view(cells, (4, 4), axis=(1, 2))
+    # the first row is the top of the board, so the main diagonal falls to the right
+    falling = np.diagonal(squares, axis1=-2, axis2=-1).sum(axis=-1, dtype=np.int8)
+    rising = np.diagonal(squares[..., ::-1, :], axis1=-2, axis2=-1).sum(axis=-1, dtype=np.int8)
+
+    return np.concatenate([part.reshape(count, -1) for part in (horizontal, vertical, falling, rising)], axis=1)
+
+
+def evaluate_batch(positions: np.ndarray) -> BatchScores:
+    """
+    Score many positions by their open windows of four cells.
+
+    :param positions: A ``(N, rows, columns)`` array of ``OWN``, ``OTHER`` and ``EMPTY`` cells,
+        where the first row is the top of the board, e.g. made by `to_array`.
+    :returns scores: The scores from the view of ``OWN``, the winners and which games are over.
+    """
+    positions = np.asarray(positions, dtype=np.int8)
+
+    if not len(positions):
+        return BatchScores(
+            scores=np.zeros(0, dtype=np.int64), winners=np.zeros(0, dtype=np.int8), terminal=np.zeros(0, dtype=bool)
+        )
+
+    codes = window_codes(positions)
+
+    won = (codes == 4).any(axis=1)
+    lost = (codes == 20).any(axis=1)
+    full = (positions[:, 0, :] != EMPTY).all(axis=1)
+
+    return BatchScores(
+        scores=_score_table()[codes].sum(axis=1),
+        winners=np.where(won, OWN, np.where(lost, OTHER, EMPTY)).astype(np.int8),
+        terminal=won | lost | full,
+    )
+
+
+def to_array(
+    boards: Sequence[BoardType], player: Player, shape: Tuple[int, int] = (GRID_ROWS, GRID_COLUMNS)
+) -> np.ndarray:
+    """
+    Convert boards of the same size to an array for `evaluate_batch`.
+
+    Bitboards, also wrapped ones, are converted from their bits, any other board from its grid.
+
+    :param boards: The boards to convert.
+    :param player: The player whose discs become ``OWN``, all other discs become ``OTHER``.
+    :param shape: The rows and columns of the boards, only used for the shape of an empty result.
+    :returns positions: A ``(N, rows, columns)`` int8 array, where the first row is the top of the board.
+    """
+    if not boards:
+        return np.zeros((0, *shape), dtype=np.int8)
+
+    bitboards = [_bitboard(board) for board in boards]
+
+    if all(board is not None for board in bitboards):
+        rows, columns = bitboards[0].rows, bitboards[0].columns  # type: ignore[union-attr]
+
+        if (rows + 1) * columns <= 64:
+            return _from_bits(bitboards, player, rows, columns)  # type: ignore[arg-type]
+
+    return np.stack([_from_grid(board.grid, player) for board in boards])
+
+
+class BatchEvaluator:
+    """
+    Scores positions with `evaluate_batch`, usable as ``evaluate`` of `SearchDriver` and `best_move`.
+
+    The search scores all children at its horizon with one call of `batch` instead of one call per child.
+    """
+
+    def __call__(self, board: BoardType, player: Player, opponent: Player) -> int:
+        """
+        Score a single position.
+
+        :param board: The board to score.
+        :param player: The player to score the position for.
+        :param opponent: The other player.
+        :returns score: Positive if the position favors the player.
+        """
+        return self.batch([board], player, opponent)[0]
+
+    def batch(self, boards: Sequence[BoardType], player: Player, opponent: Player) -> List[int]:
+        """
+        Score many positions at once.
+
+        :param boards: The boards to score, all of the same size.
+        :param player: The player to score the positions for.
+        :param opponent: The other player.
+        :returns scores: The score of every board, positive if it favors the player.
+        """
+        if not boards:
+            return []
+
+        return evaluate_batch(to_array(boards, player)).scores.tolist()
+
+
+def _bitboard(board: BoardType) -> Optional[BitBoard]:
+    """The bitboard behind a board, looking through wrappers like `HashedBoard`."""
+    while not isinstance(board, BitBoard):
+        board = getattr(board, "board", None)
+
+        if board is None:
+            return None
+
+    return board
+
+
+@lru_cache(maxsize=None)
+def _shifts(rows: int, columns: int) -> np.ndarray:
+    """The bit of every cell in a bitboard, where the first row is the top of the board."""
+    row, column = np.indices((rows, columns))
+
+    return (column * (rows + 1) + rows - 1 - row).astype(np.uint64)
+
+
+def _from_bits(boards: List[BitBoard], player: Player, rows: int, columns: int) -> np.ndarray:
+    """Convert bitboards by shifting out all cells at once."""
+    own, other = [], []
+
+    for board in boards:
+        slot = board.slot_of(player)
+
+        if slot is None:
+            own.append(0)
+            other.append(board.mask)
+        else:
+            own.append(board.boards[slot])
+            other.append(board.boards[1 - slot])
+
+    shifts = _shifts(rows, columns)
+    own_cells = (np.asarray(own, dtype=np.uint64)[:, None, None] >> shifts) & np.uint64(1)
+    other_cells = (np.asarray(other, dtype=np.uint64)[:, None, None] >> shifts) & np.uint64(1)
+
+    return own_cells.astype(np.int8) - other_cells.astype(np.int8)
+
+
+def _from_grid(grid: List[List[Optional[Player]]], player: Player) -> np.ndarray:
+    """Convert a grid cell by cell."""
+    return np.array(
+        [[EMPTY if cell is None else OWN if cell is player or cell == player else OTHER for cell in row] for row in grid],
+        dtype=np.int8,
+    )
@@ -0,0 +1,276 @@
+"""Headless match runner for AI vs. AI games."""
+
+from __future__ import annotations
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from random import Random
+from time import perf_counter
+from typing import Callable, Optional, Sequence
+from .bitboard import BitBoard
+from .state import GameState
+from .types import BoardType, Player
+
+PERCENTILES = (50, 90, 99)
+
+
+@dataclass(frozen=True)
+class LatencyStats:
+    """Latency statistics of the moves of a single player in seconds."""
+
+    count: int
+    mean: float
+    p50: float
+    p90: float
+    p99: float
+    max: float
+
+    @staticmethod
+    def from_samples(samples: Sequence[float]) -> LatencyStats:
+        """
+        Summarize the given samples.
+
+        :param samples: The measured latencies in seconds.
+        :returns stats: The summary, all zero if there are no samples.
+        """
+        if not samples:
+            return LatencyStats(count=0, mean=0.0, p50=0.0, p90=0.0, p99=0.0, max=0.0)
+
+        ordered = sorted(samples)
+        p50, p90, p99 = (
+            ordered[min(len(ordered) - 1, max(0, -(-len(ordered) * percentile // 100) - 1))]
+            for percentile in PERCENTILES
+        )
+
+        return LatencyStats(
+            count=len(ordered),
+            mean=sum(ordered) / len(ordered),
+            p50=p50,
+            p90=p90,
+            p99=p99,
+            max=ordered[-1],
+        )
+
+
+@dataclass(frozen=True)
+class MatchReport:
+    """The result of a match, wins and losses are counted from the view of the first player."""
+
+    players: tuple[str, str]
+    games: int
+    wins: int
+    draws: int
+    losses: int
+    seconds: float
+    latencies: tuple[LatencyStats, LatencyStats]
+
+    @property
+    def win_rate(self) -> float:
+        """The share of games won by the first player."""
+        return self.wins / self.games if self.games else 0.0
+
+    @property
+    def draw_rate(self) -> float:
+        """The share of games that ended in a draw."""
+        return self.draws / self.games if self.games else 0.0
+
+    @property
+    def loss_rate(self) -> float:
+        """The share of games lost by the first player."""
+        return self.losses / self.games if self.games else 0.0
+
+    @property
+    def games_per_second(self) -> float:
+        """The throughput of the match."""
+        return self.games / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        """
+        Format the report for printing.
+
+        :returns text: The formatted report.
+        """
+        lines = [
+            f"{self.players[0]} vs. {self.players[1]}: {self.games} games in {self.seconds:.2f}s "
+            f"({self.games_per_second:.1f} games/s)",
+            f"  wins {self.win_rate:.1%}, draws {self.draw_rate:.1%}, losses {self.loss_rate:.1%}",
+        ]
+
+        for name, stats in zip(self.players, self.latencies):
+            lines.append(
+                f"  {name}: {stats.count} moves, p50 {stats.p50 * 1000:.2f}ms, "
+                f"p90 {stats.p90 * 1000:.2f}ms, p99 {stats.p99 * 1000:.2f}ms, max {stats.max * 1000:.2f}ms"
+            )
+
+        return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class _Chunk:
+    """A range of games played by one worker."""
+
+    players: tuple[Player, Player]
+    board_factory: Callable[[], BoardType]
+    seed: int
+    opening_plies: int
+    swap_sides: bool
+    start: int
+    stop: int
+
+
+def play_match(
+    player0: Player,
+    player1: Player,
+    games: int = 100,
+    workers: Optional[int] = None,
+    seed: int = 2025,
+    opening_plies: int = 2,
+    swap_sides: bool = True,
+    board_factory: Callable[[], BoardType] = BitBoard,
+) -> MatchReport:
+    """
+    Play a number of games between two AI players without any UI.
+
+    Every game starts with ``opening_plies`` random moves drawn from a generator seeded with
+    ``seed`` and the game index, so a match is reproducible regardless of the number of workers.
+
+    :param player0: The first player, results are reported from its view.
+    :param player1: The second player.
+    :param games: The number of games to play.
+    :param workers: The number of processes to use, all cores if omitted, 1 plays in this process.
+    :param seed: The seed for the random openings.
+    :param opening_plies: The number of random moves at the start of every game.
+    :param swap_sides: If the players should take turns in making the first move.
+    :param board_factory: Creates the empty board for every game, must be picklable.
+    :returns report: The result of the match.
+    :raises ValueError: If one of the players is not AI-controlled or both players are the same.
+    """
+    for player in (player0, player1):
+        if player.next_move is None:
+            raise ValueError(f"'{player.name}' is not an AI player.")
+
+    # boards and evaluations tell discs apart by their player, equal players would share them
+    if player0 is player1 or player0 == player1:
+        raise ValueError(f"'{player0.name}' can not play against itself, create two players with different names.")
+
+    workers = workers or os.cpu_count() or 1
+    chunk_size = max(1, -(-games // (workers * 4)))
+    chunks = [
+        _Chunk(
+            players=(player0, player1),
+            board_factory=board_factory,
+            seed=seed,
+            opening_plies=opening_plies,
+            swap_sides=swap_sides,
+            start=start,
+            stop=min(games, start + chunk_size),
+        )
+        for start in range(0, games, chunk_size)
+    ]
+
+    start_time = perf_counter()
+
+    if workers == 1:
+        results = list(map(_play_chunk, chunks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_play_chunk, chunks))
+
+    seconds = perf_counter() - start_time
+
+    wins = draws = losses = 0
+    latencies: tuple[array, array] = (array("d"), array("d"))
+
+    for chunk_wins, chunk_draws, chunk_losses, chunk_latencies in results:
+        wins += chunk_wins
+        draws += chunk_draws
+        losses += chunk_losses
+        latencies[0].extend(chunk_latencies[0])
+        latencies[1].extend(chunk_latencies[1])
+
+    return MatchReport(
+        players=(player0.name, player1.name),
+        games=games,
+        wins=wins,
+        draws=draws,
+        losses=losses,
+        seconds=seconds,
+        latencies=(LatencyStats.from_samples(latencies[0]), LatencyStats.from_samples(latencies[1])),
+    )
+
+
+def play_game(
+    board: BoardType,
+    players: tuple[Player, Player],
+    random: Optional[Random] = None,
+    opening_plies: int = 0,
+    latencies: Optional[tuple[array, array]] = None,
+) -> GameState:
+    """
+    Play a single game until it is over.
+
+    :param board: The board to start with.
+    :param players: The players, the first one moves first.
+    :param random: The generator for the random opening moves.
+    :param opening_plies: The number of random moves at the start of the game.
+    :param latencies: Collects the time every AI move took, per player.
+    :returns state: The final state of the game.
+    :raises ValueError: If an AI makes an invalid move.
+    """
+    state = GameState(board=board, players=players, current_player=0)
+    random = random or Random()
+
+    for _ in range(opening_plies):
+        if state.game_over:
+            break
+
+        state = state.move(players[state.current_player], random.choice(state.board.valid_moves()))
+
+    while not state.game_over:
+        player = players[state.current_player]
+        opponent = players[(state.current_player + 1) % 2]
+
+        start_time = perf_counter()
+        column = player.next_move(state.board, player, opponent)  # type: ignore[misc]
+
+        if latencies is not None:
+            latencies[state.current_player].append(perf_counter() - start_time)
+
+        state = state.move(player, column)
+
+    return state
+
+
+def _play_chunk(chunk: _Chunk) -> tuple[int, int, int, tuple[array, array]]:
+    """Play a range of games, returns wins, draws, losses and latencies of the first player."""
+    wins = draws = losses = 0
+    latencies: tuple[array, array] = (array("d"), array("d"))
+
+    for index in range(chunk.start, chunk.stop):
+        swapped = chunk.swap_sides and index % 2 == 1
+        players = (chunk.players[1], chunk.players[0]) if swapped else chunk.players
+        game_latencies: tuple[array, array] = (array("d"), array("d"))
+
+        state = play_game(
+            board=chunk.board_factory(),
+            players=players,
+            random=Random(chunk.seed * 1_000_003 + index),
+            opening_plies=chunk.opening_plies,
+            latencies=game_latencies,
+        )
+
+        if swapped:
+            game_latencies = (game_latencies[1], game_latencies[0])
+
+        latencies[0].extend(game_latencies[0])
+        latencies[1].extend(game_latencies[1])
+
+        if state.winner is None:
+            draws += 1
+        elif state.winner is players[1 if swapped else 0]:
+            wins += 1
+        else:
+            losses += 1
+
+    return wins, draws, losses, latencies
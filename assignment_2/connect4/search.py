@@ -0,0 +1,442 @@
+"""Iterative deepening alpha-beta search driver."""
+
+from __future__ import annotations
+import os
+from concurrent.futures import FIRST_EXCEPTION, Future, ProcessPoolExecutor, wait
+from time import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+from .cache import Bound, HashedBoard, TranspositionTable, ZobristHasher
+from .types import BoardType, Player
+
+if TYPE_CHECKING:
+    from .book import OpeningBook
+
+WIN_SCORE = 1_000_000
+"""Score of a won position, reduced by the number of plies needed to win."""
+
+WINDOW_SCORES = (0, 1, 10, 100)
+"""Score of a window of four cells holding 0, 1, 2 or 3 discs of only one player."""
+
+Evaluation = Callable[[BoardType, Player, Player], int]
+"""Scores a position from the view of the first player, the second one is the opponent.
+
+An evaluation with a ``batch(boards, player, opponent)`` method returning a list of scores
+is used to score all children at the search horizon in one call, see `evaluation.BatchEvaluator`."""
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search once the deadline passed."""
+
+
+def evaluate(board: BoardType, player: Player, opponent: Player) -> int:
+    """
+    Score a position by its open windows of four cells.
+
+    :param board: The board to score.
+    :param player: The player to score the position for.
+    :param opponent: The other player.
+    :returns score: Positive if the position favors the player.
+    """
+    grid = board.grid
+    rows, columns = len(grid), len(grid[0])
+    score = 0
+
+    for row in range(rows):
+        for column in range(columns):
+            for dr, dc in ((0, 1), (1, 0), (1, 1), (-1, 1)):
+                if not (0 <= row + 3 * dr < rows and column + 3 * dc < columns):
+                    continue
+
+                own = other = 0
+
+                for i in range(4):
+                    cell = grid[row + i * dr][column + i * dc]
+
+                    if cell is None:
+                        continue
+                    elif cell is player or cell == player:
+                        own += 1
+                    else:
+                        other += 1
+
+                if not other and own < 4:
+                    score += WINDOW_SCORES[own]
+                elif not own and other < 4:
+                    score -= WINDOW_SCORES[other]
+
+    return score
+
+
+def order_moves(moves: List[int], columns: int, first: Optional[int] = None) -> List[int]:
+    """
+    Order moves centre-first, optionally putting a known good move in front.
+
+    :param moves: The moves to order.
+    :param columns: The number of columns of the board.
+    :param first: The move to try first, e.g. the best move of a previous search.
+    :returns moves: The ordered moves.
+    """
+    ordered = sorted(moves, key=lambda column: abs(2 * column - (columns - 1)))
+
+    if first in ordered:
+        ordered.remove(first)
+        ordered.insert(0, first)
+
+    return ordered
+
+
+class _Searcher:
+    """Negamax alpha-beta search from the view of the player whose turn it is at the root."""
+
+    def __init__(
+        self,
+        player: Player,
+        opponent: Player,
+        evaluate: Evaluation,
+        table: TranspositionTable,
+        columns: int,
+        deadline: Optional[float] = None,
+    ):
+        """Initialize."""
+        self.columns = columns
+        self.player = player
+        self.opponent = opponent
+        self.evaluate = evaluate
+        self.batch: Optional[Callable[[List[BoardType], Player, Player], List[int]]] = getattr(evaluate, "batch", None)
+        self.table = table
+        self.deadline = deadline
+        self.nodes = 0
+
+    def root(self, board: HashedBoard, depth: int, moves: List[int]) -> tuple[int, int]:
+        """Search all given root moves, returns the best one and its score."""
+        alpha, best_move = -WIN_SCORE - 1, moves[0]
+
+        for column in moves:
+            score = self.move(board, column, depth, alpha, WIN_SCORE + 1)
+
+            if score > alpha:
+                alpha, best_move = score, column
+
+        return best_move, alpha
+
+    def move(self, board: HashedBoard, column: int, depth: int, alpha: int, beta: int) -> int:
+        """Score a single root move."""
+        child = board.drop_in_column(self.player, column)
+
+        if child.get_winner() is not None:
+            return WIN_SCORE - 1
+
+        if not child.valid_moves():
+            return 0
+
+        if depth <= 1:
+            return self.evaluate(child, self.player, self.opponent)
+
+        return -self.negamax(child, depth - 1, -beta, -alpha, self.opponent, self.player, 1)
+
+    def negamax(self, board: HashedBoard, depth: int, alpha: int, beta: int, me: Player, other: Player, ply: int) -> int:
+        """Score a position from the view of the player to move."""
+        self.nodes += 1
+
+        if self.deadline is not None and time() > self.deadline:
+            raise SearchTimeout()
+
+        moves = board.valid_moves()
+
+        if not moves:
+            return 0
+
+        # the same discs with another player to move are a different position
+        key = board.key if me is self.player else ~board.key & 0xFFFFFFFFFFFFFFFF
+        original_alpha = alpha
+        hash_move = None
+
+        if (entry := self.table.probe(key)) is not None:
+            hash_move = entry.move
+
+            if entry.depth >= depth:
+                if entry.bound == Bound.EXACT:
+                    return entry.score
+                elif entry.bound == Bound.LOWER:
+                    alpha = max(alpha, entry.score)
+                else:
+                    beta = min(beta, entry.score)
+
+                if alpha >= beta:
+                    return entry.score
+
+        best_score, best_move = -WIN_SCORE - 1, moves[0]
+        ordered = order_moves(moves, self.columns, hash_move)
+        children: Optional[List[HashedBoard]] = None
+        horizon: List[int] = []
+
+        if depth <= 1 and self.batch is not None:
+            children = [board.drop_in_column(me, column) for column in ordered]
+            horizon = self.batch(children, me, other)
+
+        for i, column in enumerate(ordered):
+            child = children[i] if children is not None else board.drop_in_column(me, column)
+
+            if child.get_winner() is not None:
+                score = WIN_SCORE - ply - 1
+            elif not child.valid_moves():
+                score = 0
+            elif depth <= 1:
+                score = horizon[i] if children is not None else self.evaluate(child, me, other)
+            else:
+                score = -self.negamax(child, depth - 1, -beta, -alpha, other, me, ply + 1)
+
+            if score > best_score:
+                best_score, best_move = score, column
+
+            alpha = max(alpha, score)
+
+            if alpha >= beta:
+                break
+
+        if best_score <= original_alpha:
+            bound = Bound.UPPER
+        elif best_score >= beta:
+            bound = Bound.LOWER
+        else:
+            bound = Bound.EXACT
+
+        self.table.store(key, best_score, depth, bound, best_move)
+
+        return best_score
+
+
+_worker_table: Optional[TranspositionTable] = None
+_hasher = ZobristHasher()
+
+
+def _init_worker(table_mb: float) -> None:
+    """Create the transposition table of a worker process, it is kept for all of its searches."""
+    global _worker_table
+    _worker_table = TranspositionTable(table_mb)
+
+
+def _wrap(board: BoardType, player: Player, opponent: Player) -> HashedBoard:
+    """Wrap a board for hashing, reusing the shared hasher for the standard board size."""
+    grid = board.grid
+    hasher = _hasher if (len(grid), len(grid[0])) == (_hasher.rows, _hasher.columns) else None
+
+    return HashedBoard.wrap(board, (player, opponent), hasher)
+
+
+def _search_move(
+    board: BoardType,
+    player: Player,
+    opponent: Player,
+    column: int,
+    depth: int,
+    deadline: float,
+    evaluate: Evaluation,
+    table: Optional[TranspositionTable] = None,
+) -> Optional[int]:
+    """Score a single root move, returns None if the deadline passed."""
+    hashed = _wrap(board, player, opponent)
+    table = table if table is not None else _worker_table
+    searcher = _Searcher(
+        player, opponent, evaluate, table if table is not None else TranspositionTable(), len(hashed.grid[0]), deadline
+    )
+
+    try:
+        return searcher.move(hashed, column, depth, -WIN_SCORE - 1, WIN_SCORE + 1)
+    except SearchTimeout:
+        return None
+
+
+def best_move(
+    board: BoardType,
+    player: Player,
+    opponent: Player,
+    depth: int,
+    evaluate: Evaluation = evaluate,
+    table: Optional[TranspositionTable] = None,
+) -> tuple[int, int]:
+    """
+    Search a position to a fixed depth in this process.
+
+    :param board: The board to search.
+    :param player: The player to move.
+    :param opponent: The other player.
+    :param depth: The number of plies to search.
+    :param evaluate: Scores the positions at the search horizon.
+    :param table: The transposition table to use, a new one is created if omitted.
+    :returns result: The best column and its score.
+    """
+    columns = len(board.grid[0])
+    searcher = _Searcher(player, opponent, evaluate, table if table is not None else TranspositionTable(), columns)
+    moves = order_moves(board.valid_moves(), columns)
+
+    return searcher.root(_wrap(board, player, opponent), depth, moves)
+
+
+class SearchDriver:
+    """
+    Iterative deepening search with a hard deadline per move, usable as move function of `Player.ai`.
+
+    Every depth is split at the root: each root move is searched by one of the worker processes.
+    Each worker keeps its own transposition table between searches, tables are never shared or
+    merged. The only result passed on from a completed depth is the order of the root moves, which
+    are sorted by their scores so the best move so far is searched first at the next depth. The
+    best move of the deepest completed depth is returned. Errors raised by ``evaluate`` in a worker
+    are raised here, like in the single process search.
+    """
+
+    def __init__(
+        self,
+        time_budget: float = 1.0,
+        workers: Optional[int] = None,
+        evaluate: Evaluation = evaluate,
+        max_depth: Optional[int] = None,
+        table_mb: float = 16,
+        book: Optional[OpeningBook] = None,
+    ):
+        """
+        Initialize.
+
+        :param time_budget: The seconds a move may take.
+        :param workers: The number of processes to search with, all cores if omitted, 1 searches in this process.
+        :param evaluate: Scores the positions at the search horizon, must be picklable.
+        :param max_depth: The maximum depth to search to, all remaining plies if omitted.
+        :param table_mb: The size of the transposition table of each worker in megabytes.
+        :param book: The opening book to look up positions in before searching.
+        """
+        self.time_budget = time_budget
+        self.workers = workers or os.cpu_count() or 1
+        self.evaluate = evaluate
+        self.max_depth = max_depth
+        self.table_mb = table_mb
+        self.book = book
+
+        self.last_depth = 0
+        """The deepest completed depth of the last search."""
+        self.last_scores: Dict[int, int] = {}
+        """The scores of the root moves at the deepest completed depth of the last search."""
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._table: Optional[TranspositionTable] = None
+
+    def __call__(self, board: BoardType, player: Player, opponent: Player) -> int:
+        """
+        Get the next column the player should put a disk in.
+
+        :param board: The current game board.
+        :param player: The player to move.
+        :param opponent: The other player.
+        :returns column: The column in which to put a disk.
+        """
+        return self.search(board, player, opponent)
+
+    def __enter__(self) -> SearchDriver:
+        """Use the driver as context manager, which closes the workers on exit."""
+        return self
+
+    def __exit__(self, *_) -> None:
+        """Close the workers."""
+        self.close()
+
+    def __getstate__(self) -> dict:
+        """Pickle the settings only, so the driver can be sent to other processes."""
+        return {**self.__dict__, "_executor": None, "_table": None}
+
+    def close(self) -> None:
+        """Shut down the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def search(self, board: BoardType, player: Player, opponent: Player) -> int:
+        """
+        Search the best move until the time budget is used up.
+
+        :param board: The current game board.
+        :param player: The player to move.
+        :param opponent: The other player.
+        :returns column: The best column found.
+        :raises ValueError: If no move is possible.
+        """
+        deadline = time() + self.time_budget - min(0.05, self.time_budget / 10)
+        moves = board.valid_moves()
+
+        if not moves:
+            raise ValueError("No moves possible.")
+
+        moves = order_moves(moves, len(board.grid[0]))
+        self.last_depth, self.last_scores = 0, {}
+
+        if len(moves) == 1:
+            return moves[0]
+
+        if self.book is not None and (column := self.book.lookup(board, player)) in moves:
+            return column
+
+        max_depth = self.max_depth or sum(row.count(None) for row in board.grid)
+
+        for depth in range(1, max_depth + 1):
+            scores = self._search_depth(board, player, opponent, moves, depth, deadline)
+
+            if scores is None:
+                break
+
+            moves = sorted(moves, key=lambda column: -scores[column])
+            self.last_depth, self.last_scores = depth, scores
+
+            # the result can not change anymore once a win is found or every move loses
+            if scores[moves[0]] >= WIN_SCORE - depth or scores[moves[0]] <= -WIN_SCORE + depth:
+                break
+
+        return moves[0]
+
+    def _search_depth(
+        self, board: BoardType, player: Player, opponent: Player, moves: List[int], depth: int, deadline: float
+    ) -> Optional[Dict[int, int]]:
+        """Score all root moves at the given depth, returns None if the deadline passed."""
+        if self.workers == 1:
+            if self._table is None:
+                self._table = TranspositionTable(self.table_mb)
+
+            scores: Dict[int, int] = {}
+
+            for column in moves:
+                score = _search_move(board, player, opponent, column, depth, deadline, self.evaluate, self._table)
+
+                if score is None:
+                    return None
+
+                scores[column] = score
+
+            return scores
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=(self.table_mb,)
+            )
+
+        futures: Dict[Future, int] = {
+            self._executor.submit(
+                _search_move, board, player, opponent, column, depth, deadline, self.evaluate
+            ): column
+            for column in moves
+        }
+        done, pending = wait(futures, timeout=max(0.0, deadline - time()), return_when=FIRST_EXCEPTION)
+
+        for future in pending:
+            future.cancel()
+
+        # a failed worker is raised like in the single process search, not mistaken for a timeout
+        for future in done:
+            if future.exception() is not None:
+                raise future.exception()  # type: ignore[misc]
+
+        if pending:
+            return None
+
+        results = {futures[future]: future.result() for future in done}
+
+        if any(score is None for score in results.values()):
+            return None
+
+        return results  # type: ignore[return-value]
@@ -1,6 +1,16 @@
 """Hashiwokakero game."""
 
 from .types import Bridge, Island, HashiwokakeroBoard
-from .engine import HashiwokakeroGameEngine
+from .solver import HashiwokakeroSolver, solve
 
-__all__ = ["HashiwokakeroGameEngine", "HashiwokakeroBoard", "Bridge", "Island"]
+__all__ = ["HashiwokakeroGameEngine", "HashiwokakeroBoard", "Bridge", "Island", "HashiwokakeroSolver", "solve"]
+
+
+def __getattr__(name: str):
+    """Import the engine on first use, so headless code does not pay for importing pygame."""
+    if name == "HashiwokakeroGameEngine":
+        from .engine import HashiwokakeroGameEngine
+
+        return HashiwokakeroGameEngine
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,107 @@
+import queue
+import threading
+from typing import Callable, List, Optional, Tuple
+from .solver import ASSIGN, BACKTRACK, HashiwokakeroSolver, SolverEvent
+from .types import Bridge, HashiwokakeroBoard, Island
+
+
+class BackgroundSolve:
+    """
+    Runs a solver on a copy of a board in a worker thread, so a render loop can poll its progress.
+
+    A HashiwokakeroSolver reports its events and can be cancelled. Any other solve callable
+    only reports whether it is done, cancelling it discards its result but its thread keeps
+    running until the callable returns.
+    """
+
+    def __init__(self, board: HashiwokakeroBoard, solve: Callable[[HashiwokakeroBoard], bool],
+                 max_events: int = 10000):
+        self.board = board
+        self.copy = HashiwokakeroBoard(list(board.islands), size=board.size)
+        self.events: "queue.Queue[SolverEvent]" = queue.Queue(maxsize=max_events)
+        self.dropped = 0
+        """Events that did not fit into the queue"""
+        self.path: List[Tuple[Tuple[Island, Island], int]] = []
+        """The decisions of the search when `poll` was last called"""
+        self._path: List[Tuple[Tuple[Island, Island], int]] = []
+        self._lock = threading.Lock()
+        self.last_event: Optional[SolverEvent] = None
+        """The latest event when `poll` was last called, even if it was dropped from the queue"""
+        self._last_event: Optional[SolverEvent] = None
+        self.solved: Optional[bool] = None
+        self.error: Optional[Exception] = None
+        self.bridges: List[Bridge] = []
+        """The bridges of the solution, validated against the islands of the board"""
+        self.cancelled = False
+
+        if isinstance(solve, HashiwokakeroSolver):
+            self.solver: Optional[HashiwokakeroSolver] = HashiwokakeroSolver(timeout=solve.timeout, listener=self._on_event)
+            self.solve = self.solver
+        else:
+            self.solver = None
+            self.solve = solve
+
+        self.thread = threading.Thread(target=self._run, name="hashiwokakero-solver", daemon=True)
+        self.thread.start()
+
+    @property
+    def done(self) -> bool:
+        return not self.thread.is_alive()
+
+    def cancel(self):
+        self.cancelled = True
+        if self.solver is not None:
+            self.solver.cancel()
+
+    def poll(self) -> List[SolverEvent]:
+        """Take all queued events and the current decisions of the search"""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                break
+        with self._lock:
+            self.path = list(self._path)
+            self.last_event = self._last_event
+        return events
+
+    def apply(self) -> bool:
+        """Copy the bridges of a finished solve to the original board, returns whether it was solved"""
+        if not self.done or self.cancelled or not self.solved:
+            return False
+        self.board.bridges = self.bridges
+        return True
+
+    def _run(self):
+        try:
+            self.solved = self.solve(self.copy)
+            if self.solved:
+                self.bridges = self._validate(self.copy.bridges)
+        except Exception as e:
+            self.error = e
+            self.solved = False
+
+    def _validate(self, bridges) -> List[Bridge]:
+        """Replay the bridges on an empty board, a solve callable may have set invalid ones directly"""
+        board = HashiwokakeroBoard(list(self.copy.islands), size=self.copy.size)
+        for bridge in bridges:
+            if (bridge.island1, bridge.island2) not in board.connection_index():
+                raise ValueError(f"Islands {bridge.island1} and {bridge.island2} can not be connected.")
+            board.add_bridge(bridge.island1, bridge.island2, bridge.count)
+        return list(board.bridges)
+
+    def _on_event(self, event: SolverEvent):
+        if self.cancelled:
+            self.solver.cancel()
+        with self._lock:
+            if event.kind == ASSIGN:
+                del self._path[event.depth - 1:]
+                self._path.append((event.connection, event.value))
+            elif event.kind == BACKTRACK:
+                del self._path[event.depth:]
+            self._last_event = event
+        try:
+            self.events.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
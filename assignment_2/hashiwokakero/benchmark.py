@@ -0,0 +1,98 @@
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, List, Optional, Sequence
+from .puzzles import BUILTIN_PUZZLES, Puzzle, generate_puzzles, load_puzzles
+from .solver import HashiwokakeroSolver
+from .types import HashiwokakeroBoard
+
+CORPUS = Path(__file__).with_name("corpus.txt")
+"""Generated puzzles of size 15 and 25, see `python -m hashiwokakero.puzzles`"""
+
+
+@dataclass
+class BenchmarkResult:
+    """Timings and node counts of a solver over a puzzle corpus"""
+    puzzles: int
+    solved: int
+    seconds: List[float]
+    nodes: List[int]
+    """Nodes expanded per puzzle, empty if the solver does not report them"""
+
+    @property
+    def solve_rate(self) -> float:
+        return self.solved / self.puzzles if self.puzzles else 0.0
+
+    @property
+    def median(self) -> float:
+        return percentile(self.seconds, 50)
+
+    @property
+    def p99(self) -> float:
+        return percentile(self.seconds, 99)
+
+    def summary(self) -> str:
+        lines = [
+            f"{self.solved}/{self.puzzles} solved ({self.solve_rate:.1%}), "
+            f"median {self.median * 1000:.2f}ms, p99 {self.p99 * 1000:.2f}ms, total {sum(self.seconds):.2f}s"
+        ]
+        if self.nodes:
+            lines.append(f"nodes: median {percentile(self.nodes, 50)}, p99 {percentile(self.nodes, 99)}, "
+                         f"total {sum(self.nodes)}")
+        return "\n".join(lines)
+
+
+def percentile(samples: Sequence, percent: float):
+    """Nearest rank percentile, 0 for no samples"""
+    if not samples:
+        return 0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, -(-len(ordered) * percent // 100) - 1))]
+
+
+def run_benchmark(puzzles: Sequence[Puzzle], solve: Optional[Callable[[HashiwokakeroBoard], bool]] = None,
+                  verify: bool = True) -> BenchmarkResult:
+    """
+    Solve every puzzle with `solve`, which defaults to a HashiwokakeroSolver.
+    Node counts are read from `solve.stats.nodes` if the callable has them. With `verify`
+    a puzzle only counts as solved if every island has its required number of bridges.
+    """
+    solve = solve if solve is not None else HashiwokakeroSolver()
+    result = BenchmarkResult(puzzles=len(puzzles), solved=0, seconds=[], nodes=[])
+
+    for puzzle in puzzles:
+        board = puzzle.board()
+        start = perf_counter()
+        solved = solve(board)
+        result.seconds.append(perf_counter() - start)
+
+        stats = getattr(solve, "stats", None)
+        if stats is not None:
+            result.nodes.append(stats.nodes)
+        if solved and (not verify or all(board.island_bridge_count(island) == island.value for island in board.islands)):
+            result.solved += 1
+
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Hashiwokakero solver.")
+    parser.add_argument("path", type=Path, nargs="?", help="puzzle file, defaults to the bundled corpus")
+    parser.add_argument("--generate", action="store_true", help="benchmark freshly generated puzzles")
+    parser.add_argument("--count", type=int, default=20, help="number of generated puzzles")
+    parser.add_argument("--size", type=int, default=25, help="size of the generated puzzles")
+    parser.add_argument("--density", type=float, default=0.2, help="islands per cell of the generated puzzles")
+    parser.add_argument("--seed", type=int, default=2025, help="seed of the generated puzzles")
+    parser.add_argument("--builtin", action="store_true", help="benchmark the built-in puzzles")
+    parser.add_argument("--timeout", type=float, default=60.0, help="timeout per puzzle in seconds")
+    arguments = parser.parse_args()
+
+    if arguments.builtin:
+        corpus = list(BUILTIN_PUZZLES.values())
+    elif arguments.generate:
+        corpus = generate_puzzles(arguments.count, arguments.size, arguments.density, arguments.seed)
+    else:
+        corpus = load_puzzles(arguments.path or CORPUS)
+
+    print(run_benchmark(corpus, HashiwokakeroSolver(timeout=arguments.timeout)).summary())
@@ -1,18 +1,78 @@
 import pygame
 import sys
 import math
-import random
+import os
+from pathlib import Path
+import numpy as np
 from .types import HashiwokakeroBoard
-from typing import Callable
-
-
+from .puzzles import BUILTIN_PUZZLES, Puzzle
+from .background import BackgroundSolve
+from .solver import HashiwokakeroSolver
+from typing import Callable, Optional
+
+PAPER_COLOR = (253, 245, 230)  # Light cream color for paper
+TEXTURE_CACHE_DIR = Path(os.environ.get("HASHIWOKAKERO_CACHE_DIR", Path.home() / ".cache" / "hashiwokakero"))
+
+
+def paper_texture_pixels(width: int, height: int, seed: Optional[int] = None) -> np.ndarray:
+    """
+    Pixels of a paper-like texture as (width, height, 3) array, 2x2 dots with a random
+    brightness in a 4 pixel raster on a cream background
+    """
+    pixels = np.empty((width, height, 3), dtype=np.uint8)
+    pixels[:] = PAPER_COLOR
+    noise = np.random.default_rng(seed).integers(-10, 11, size=((width + 3) // 4, (height + 3) // 4, 1))
+    dots = np.clip(np.asarray(PAPER_COLOR) + noise, 0, 255).astype(np.uint8)
+    for dx in range(2):
+        for dy in range(2):
+            target = pixels[dx::4, dy::4]
+            target[:] = dots[:target.shape[0], :target.shape[1]]
+    return pixels
+
+
+def cached_paper_texture_pixels(width: int, height: int, seed: Optional[int] = None) -> np.ndarray:
+    """
+    Same as `paper_texture_pixels`, seeded textures are stored as .npy files in TEXTURE_CACHE_DIR
+    (overridable by the HASHIWOKAKERO_CACHE_DIR environment variable)
+    """
+    if seed is None:
+        return paper_texture_pixels(width, height)
+
+    path = TEXTURE_CACHE_DIR / f"paper_{width}x{height}_{seed}.npy"
+    try:
+        pixels = np.load(path)
+        if pixels.shape == (width, height, 3) and pixels.dtype == np.uint8:
+            return pixels
+    except (OSError, ValueError):
+        pass
+
+    pixels = paper_texture_pixels(width, height, seed)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first, so concurrent engines never read a partial texture
+        temporary = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(temporary, "wb") as file:
+            np.save(file, pixels)
+        os.replace(temporary, path)
+    except OSError:
+        pass
+    return pixels
 
 
 class HashiwokakeroGameEngine:
     board: HashiwokakeroBoard
-    def __init__(self, solve: Callable[[HashiwokakeroBoard], bool], width=700, height=700):
+    def __init__(self, solve: Optional[Callable[[HashiwokakeroBoard], bool]] = None, width=700, height=700,
+                 retained: bool = True, texture_seed: Optional[int] = 2025):
+        """
+        Set `retained` to False to redraw every frame, otherwise the screen is only redrawn
+        when the board changed or an input event arrived.
+        Solving runs in a worker thread, a HashiwokakeroSolver (the default) shows its progress while searching.
+        The paper texture of a `texture_seed` is cached on disk, None creates a new texture every time.
+        """
         pygame.init()
-        self.solve = solve
+        self.solve = solve if solve is not None else HashiwokakeroSolver()
+        self.retained = retained
+        self.texture_seed = texture_seed
         self.width = width
         self.height = height
         self.screen = pygame.display.set_mode((width, height))
@@ -24,11 +84,23 @@ class HashiwokakeroGameEngine:
         self.grid_color = (139, 69, 19)  # Chocolate brown grid lines
         self.bridge_color = (30, 180, 150)  # Dark cyan bridges
         self.fraction_color = (0, 60, 0)  # Dark green fraction text
+        self.search_color = (230, 120, 20)  # Orange decisions of a running solver
 
         self.cell_size = 50
         self.grid_size = 5
         self.margin = 50
 
+        # Render caches, fonts are loaded once and rendered texts and rope polylines are kept
+        self.font = pygame.font.SysFont('Arial', 18)
+        self._glyphs: dict[tuple[str, tuple[int, int, int]], pygame.Surface] = {}
+        self._ropes: dict[tuple[int, int, int, int, bool], list[tuple[int, int]]] = {}
+        self._background: Optional[pygame.Surface] = None
+        self._background_grid_size: Optional[int] = None
+        self._drawn: Optional[tuple[HashiwokakeroBoard, int]] = None
+        self.solving: Optional[BackgroundSolve] = None
+        self._cancelled: Optional[BackgroundSolve] = None
+        """The last cancelled solve, a new one is only started once its thread finished"""
+
         # Create paper texture
         self.bg_texture = self.create_paper_texture()
 
@@ -38,92 +110,71 @@ class HashiwokakeroGameEngine:
     def create_paper_texture(self):
         """Create a paper-like texture background"""
         texture = pygame.Surface((self.width, self.height))
-        base_color = (253, 245, 230)  # Light cream color for paper
-        texture.fill(base_color)
-
-        # Add noise to create paper texture
-        for y in range(0, self.height, 4):
-            for x in range(0, self.width, 4):
-                # Random slight color variation - keep within valid RGB range (0-255)
-                noise = random.randint(-10, 10)
-                r = max(0, min(255, base_color[0] + noise))
-                g = max(0, min(255, base_color[1] + noise))
-                b = max(0, min(255, base_color[2] + noise))
-
-                # Draw a small dot
-                pygame.draw.rect(texture, (r, g, b), (x, y, 2, 2))
-
+        pygame.surfarray.blit_array(texture, cached_paper_texture_pixels(self.width, self.height, self.texture_seed))
         return texture
 
     def load_puzzle(self, puzzle_name="puzzle1", puzzle_data=None):
         """Load a predefined puzzle or from file"""
+        self.cancel_solve()
 
-        # Set grid size based on puzzle
-        if puzzle_name == "puzzle1":
-            self.grid_size = 6
-        elif puzzle_name == "puzzle2":
-            self.grid_size = 10
-        elif puzzle_name == "puzzle3":
-            self.grid_size = 11
-        else:
-            self.grid_size = 6
-
-        # Example puzzles of varying difficulty
-        puzzles = {
-            "puzzle1": [  # 6x6 puzzle
-                (0, 0, 3), (0, 5, 4),
-                (1, 1, 4), (1, 2, 4),
-                (3, 2, 4), (3, 5, 4),
-                (4, 1, 4), (4, 4, 4),
-                (5, 0, 2), (5, 4, 3)
-            ],
-            "puzzle2": [  # 10x10 puzzle
-                (0, 1, 1), (0, 2, 1), (0, 8, 1), (0, 9, 1),
-                (1, 4, 2), (1, 5, 2),
-                (2, 1, 2), (2, 2, 2), (2, 4, 4), (2, 5, 4),  (2, 8, 2), (2, 9, 2),
-                (9, 1, 2), (9, 4, 4), (9, 5, 4), (9, 9, 2),
-            ],
-            "puzzle3": [  # 11x11 puzzle
-                (0, 2, 1), (0, 4, 2), (0, 6, 2), (0, 8, 2), (0, 10, 1),
-                (1, 0, 2), (1, 3, 4), (1, 5, 2), (1, 7, 1),
-                (2, 4, 2), (2, 6, 4), (2, 8, 6), (2, 10, 3),
-                (3, 1, 1), (3, 3, 3), (3, 5, 1),
-                (4, 0, 2), (4, 4, 2), (4, 6, 4), (4, 8, 8), (4, 10, 5),
-                (5, 2, 3), (5, 5, 4),
-                (6, 0, 1), (6, 6, 3), (6, 8, 6), (6, 10, 4),
-                (7, 3, 1), (7, 5, 4), (7, 7, 1),
-                (8, 0, 2), (8, 2, 5), (8, 4, 1), (8, 6, 1), (8, 8, 2),
-                (9, 3, 1), (9, 5, 3), (9, 7, 3), (9, 10, 2),
-                (10, 0, 1), (10, 2, 3), (10, 4, 2), (10, 6, 2), (10, 9, 1),
-            ],
-        }
-
-        island_data = puzzle_data if puzzle_data else puzzles.get(puzzle_name, puzzles["puzzle1"])
-        self.board = HashiwokakeroBoard.from_tuple_definition(island_data, grid_size=self.grid_size)
+        # The grid size is taken from the named puzzle, unknown names use puzzle1
+        puzzle = BUILTIN_PUZZLES.get(puzzle_name, BUILTIN_PUZZLES["puzzle1"])
+        if puzzle_data:
+            puzzle = Puzzle(puzzle.size, tuple(puzzle_data))
+        self.grid_size = puzzle.size
+        self.board = puzzle.board()
 
     def set_board(self, board: HashiwokakeroBoard):
         """Set the game board to a specific HashiwokakeroBoard instance"""
+        self.cancel_solve()
         self.board = board
         self.grid_size = board.size
 
     def draw(self):
-        self.screen.blit(self.bg_texture, (0, 0))
-        self.draw_grid()
+        if self.retained:
+            self.screen.blit(self.background(), (0, 0))
+        else:
+            self.screen.blit(self.bg_texture, (0, 0))
+            self.draw_grid()
         self.draw_islands()
         self.draw_bridges()
+        if self.solving is not None:
+            self.draw_search()
         pygame.display.flip()
-
-    def draw_grid(self):
+        self._drawn = (self.board, self.board.version)
+
+    def needs_redraw(self) -> bool:
+        """Whether the board changed since the last frame was drawn or a solver is running"""
+        return self.solving is not None or self._drawn is None or self._drawn[0] is not self.board or self._drawn[1] != self.board.version
+
+    def background(self) -> pygame.Surface:
+        """The paper texture with the grid drawn onto it, rebuilt when the grid size changes"""
+        if self._background is None or self._background_grid_size != self.grid_size:
+            self._background = self.bg_texture.copy()
+            self._background_grid_size = self.grid_size
+            self.draw_grid(self._background)
+        return self._background
+
+    def glyph(self, text: str, color: tuple[int, int, int]) -> pygame.Surface:
+        """The rendered text, cached"""
+        key = (text, color)
+        if key not in self._glyphs:
+            self._glyphs[key] = self.font.render(text, True, color)
+        return self._glyphs[key]
+
+    def draw_grid(self, surface: Optional[pygame.Surface] = None):
+        if surface is None:
+            surface = self.screen
         for i in range(self.grid_size + 1):
             # Horizontal lines
             pygame.draw.line(
-                self.screen, self.grid_color,
+                surface, self.grid_color,
                 (self.margin, self.margin + i * self.cell_size),
                 (self.margin + self.grid_size * self.cell_size, self.margin + i * self.cell_size)
             )
             # Vertical lines
             pygame.draw.line(
-                self.screen, self.grid_color,
+                surface, self.grid_color,
                 (self.margin + i * self.cell_size, self.margin),
                 (self.margin + i * self.cell_size, self.margin + self.grid_size * self.cell_size)
             )
@@ -137,13 +188,12 @@ class HashiwokakeroGameEngine:
             pygame.draw.circle(self.screen, self.island_color, (x, y), 15)
 
             # Draw island value
-            font = pygame.font.SysFont('Arial', 18)
-            text = font.render(str(island.value), True, (255, 255, 255))
+            text = self.glyph(str(island.value), (255, 255, 255))
             text_rect = text.get_rect(center=(x, y))
             self.screen.blit(text, text_rect)
 
             # Optional: Show current bridge count
-            current = font.render(f"{self.board.island_bridge_count(island)}/{island.value}", True, self.fraction_color)
+            current = self.glyph(f"{self.board.island_bridge_count(island)}/{island.value}", self.fraction_color)
             current_rect = current.get_rect(center=(x, y + 25))
             self.screen.blit(current, current_rect)
 
@@ -174,12 +224,49 @@ class HashiwokakeroGameEngine:
                     self.draw_rope(x1 - 4, y1, x2 - 4, y2, horizontal=False)
                     self.draw_rope(x1 + 4, y1, x2 + 4, y2, horizontal=False)
 
+    def draw_search(self):
+        """Overlay the current decisions and counters of the running solver"""
+        for (island1, island2), count in self.solving.path:
+            if count:
+                pygame.draw.line(self.screen, self.search_color,
+                                 (self.margin + island1.col * self.cell_size, self.margin + island1.row * self.cell_size),
+                                 (self.margin + island2.col * self.cell_size, self.margin + island2.row * self.cell_size),
+                                 2 * count)
+
+        event = self.solving.last_event
+        if event is None:
+            status = "Solving..."
+        else:
+            status = (f"Solving... depth {event.depth}, {event.nodes} nodes, {event.backtracks} backtracks, "
+                      f"{event.propagations} propagations, {event.seconds:.1f}s")
+        text = self.font.render(status + " (Esc to cancel)", True, self.fraction_color)
+        self.screen.blit(text, text.get_rect(midbottom=(self.width // 2, self.height - 10)))
+
     def draw_rope(self, x1, y1, x2, y2, horizontal=True):
         """Draw a rope-like line between two points"""
         # Dark cyan rope color
         rope_color = (30, 180, 150)
 
-        # Rest of the method stays the same
+        points = self._ropes.get((x1, y1, x2, y2, horizontal))
+        if points is None:
+            points = self._ropes[(x1, y1, x2, y2, horizontal)] = self.rope_points(x1, y1, x2, y2, horizontal)
+
+        for i in range(len(points) - 1):
+            pygame.draw.line(self.screen, rope_color, points[i], points[i + 1], 2)
+
+        for i in range(1, len(points) - 1, 2):
+            if horizontal:
+                pygame.draw.line(self.screen, rope_color,
+                                 (points[i][0], points[i][1] - 1),
+                                 (points[i][0], points[i][1] + 1), 1)
+            else:
+                pygame.draw.line(self.screen, rope_color,
+                                 (points[i][0] - 1, points[i][1]),
+                                 (points[i][0] + 1, points[i][1]), 1)
+
+    @staticmethod
+    def rope_points(x1, y1, x2, y2, horizontal=True):
+        """The polyline of a rope-like line between two points"""
         amplitude = 3
         frequency = 15
         segments = max(int(abs(x2 - x1 if horizontal else y2 - y1) / 5), 2)
@@ -195,19 +282,7 @@ class HashiwokakeroGameEngine:
                 x = x1 + amplitude * math.sin(t * frequency)
                 y = y1 + (y2 - y1) * t
                 points.append((int(x), int(y)))
-
-        for i in range(len(points) - 1):
-            pygame.draw.line(self.screen, rope_color, points[i], points[i + 1], 2)
-
-        for i in range(1, len(points) - 1, 2):
-            if horizontal:
-                pygame.draw.line(self.screen, rope_color,
-                                 (points[i][0], points[i][1] - 1),
-                                 (points[i][0], points[i][1] + 1), 1)
-            else:
-                pygame.draw.line(self.screen, rope_color,
-                                 (points[i][0] - 1, points[i][1]),
-                                 (points[i][0] + 1, points[i][1]), 1)
+        return points
 
 
 
@@ -217,7 +292,38 @@ class HashiwokakeroGameEngine:
 
     def remove_bridge(self, bridge):
         """Remove a bridge and update island bridge counts"""
-        self.board.bridges.remove(bridge)
+        self.board.remove_bridge(bridge)
+
+    def start_solve(self):
+        """Solve the current board in a worker thread, see `update_solve`"""
+        if self.solving is not None:
+            return
+        if self._cancelled is not None and not self._cancelled.done:
+            print("The cancelled solver is still running, try again once it finished.")
+            return
+        self._cancelled = None
+        self.solving = BackgroundSolve(self.board, self.solve)
+
+    def cancel_solve(self):
+        if self.solving is not None:
+            self.solving.cancel()
+            self._cancelled, self.solving = self.solving, None
+
+    def update_solve(self):
+        """Poll a running solver and apply its solution once it is done"""
+        if self.solving is None:
+            return
+        self.solving.poll()
+        if not self.solving.done:
+            return
+
+        solving, self.solving = self.solving, None
+        if solving.error is not None:
+            print(f"Error solving puzzle: {solving.error}")
+        elif solving.apply():
+            print("Puzzle solved!")
+        else:
+            print("No solution found.")
 
     def run(self):
         """Main game loop"""
@@ -226,20 +332,18 @@ class HashiwokakeroGameEngine:
         # Initialize solver
 
         while running:
-            for event in pygame.event.get():
+            events = pygame.event.get()
+            for event in events:
                 if event.type == pygame.QUIT:
                     running = False
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_s:  # Press 'S' to solve
-                        try:
-                            if self.solve(self.board):
-                                print("Puzzle solved!")
-                            else:
-                                print("No solution found.")
-                        except Exception as e:
-                            print(f"Error solving puzzle: {e}")
+                        self.start_solve()
+                    elif event.key == pygame.K_ESCAPE:  # Press 'Esc' to cancel solving
+                        self.cancel_solve()
                     elif event.key == pygame.K_r:  # Press 'R' to reset
-                        self.board.bridges = []
+                        self.cancel_solve()
+                        self.board.clear_bridges()
                     elif event.key == pygame.K_1:  # Load puzzle 1
                         self.load_puzzle("puzzle1")
                     elif event.key == pygame.K_2:  # Load puzzle 2
@@ -247,9 +351,11 @@ class HashiwokakeroGameEngine:
                     elif event.key == pygame.K_3:  # Load puzzle 2
                         self.load_puzzle("puzzle3")
 
-
-            self.draw()
+            self.update_solve()
+            if not self.retained or events or self.needs_redraw():
+                self.draw()
             pygame.time.delay(30)
 
+        self.cancel_solve()
         pygame.quit()
 
@@ -0,0 +1,258 @@
+import argparse
+import random
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from .solver import HashiwokakeroSolver
+from .types import HashiwokakeroBoard, Island
+
+
+@dataclass(frozen=True)
+class Puzzle:
+    size: int
+    islands: tuple[tuple[int, int, int], ...]
+    """(row, col, value) of every island"""
+
+    def board(self) -> HashiwokakeroBoard:
+        return HashiwokakeroBoard.from_tuple_definition(list(self.islands), grid_size=self.size)
+
+
+# Example puzzles of varying difficulty
+BUILTIN_PUZZLES = {
+    "puzzle1": Puzzle(6, (  # 6x6 puzzle
+        (0, 0, 3), (0, 5, 4),
+        (1, 1, 4), (1, 2, 4),
+        (3, 2, 4), (3, 5, 4),
+        (4, 1, 4), (4, 4, 4),
+        (5, 0, 2), (5, 4, 3)
+    )),
+    "puzzle2": Puzzle(10, (  # 10x10 puzzle
+        (0, 1, 1), (0, 2, 1), (0, 8, 1), (0, 9, 1),
+        (1, 4, 2), (1, 5, 2),
+        (2, 1, 2), (2, 2, 2), (2, 4, 4), (2, 5, 4),  (2, 8, 2), (2, 9, 2),
+        (9, 1, 2), (9, 4, 4), (9, 5, 4), (9, 9, 2),
+    )),
+    "puzzle3": Puzzle(11, (  # 11x11 puzzle
+        (0, 2, 1), (0, 4, 2), (0, 6, 2), (0, 8, 2), (0, 10, 1),
+        (1, 0, 2), (1, 3, 4), (1, 5, 2), (1, 7, 1),
+        (2, 4, 2), (2, 6, 4), (2, 8, 6), (2, 10, 3),
+        (3, 1, 1), (3, 3, 3), (3, 5, 1),
+        (4, 0, 2), (4, 4, 2), (4, 6, 4), (4, 8, 8), (4, 10, 5),
+        (5, 2, 3), (5, 5, 4),
+        (6, 0, 1), (6, 6, 3), (6, 8, 6), (6, 10, 4),
+        (7, 3, 1), (7, 5, 4), (7, 7, 1),
+        (8, 0, 2), (8, 2, 5), (8, 4, 1), (8, 6, 1), (8, 8, 2),
+        (9, 3, 1), (9, 5, 3), (9, 7, 3), (9, 10, 2),
+        (10, 0, 1), (10, 2, 3), (10, 4, 2), (10, 6, 2), (10, 9, 1),
+    )),
+}
+
+
+def parse_puzzle(line: str) -> Puzzle:
+    """
+    Parse a puzzle in the line format `<size> <row>,<col>,<value> <row>,<col>,<value> ...`,
+    e.g. `6 0,0,3 0,5,4 ...`
+    """
+    size, *islands = line.split()
+    try:
+        return Puzzle(int(size), tuple(tuple(int(value) for value in island.split(",")) for island in islands))
+    except ValueError:
+        raise ValueError(f"Invalid puzzle line '{line.strip()}'")
+
+
+def format_puzzle(puzzle: Puzzle) -> str:
+    return " ".join([str(puzzle.size)] + [f"{row},{col},{value}" for row, col, value in puzzle.islands])
+
+
+def load_puzzles(path: Union[str, Path]) -> List[Puzzle]:
+    """Read a puzzle file with one puzzle per line, empty lines and lines starting with # are skipped"""
+    with open(path) as file:
+        return [parse_puzzle(line) for line in file if line.strip() and not line.lstrip().startswith("#")]
+
+
+def save_puzzles(path: Union[str, Path], puzzles: Iterable[Puzzle], comment: Optional[str] = None):
+    with open(path, "w") as file:
+        if comment:
+            file.writelines(f"# {line}\n" for line in comment.splitlines())
+        file.writelines(format_puzzle(puzzle) + "\n" for puzzle in puzzles)
+
+
+def generate_puzzle(size: int, density: float = 0.2, seed: Optional[int] = None, attempts: int = 10,
+                    timeout: float = 10.0) -> Puzzle:
+    """
+    Generate a uniquely solvable puzzle with about `density * size * size` islands.
+
+    Islands are grown from a random start by drawing non crossing bridges, the island values are
+    the sums of the drawn bridges. As long as the solver finds another solution, an island is added
+    that the drawn bridges allow but the other solution does not: between two islands the other
+    solution connects, bridged to one of them, or in the middle of a drawn bridge whose count the
+    other solution changes. A candidate is only discarded if no such island fits or the solver
+    times out, then a new one is grown.
+    """
+    rng = random.Random(seed)
+    solver = HashiwokakeroSolver(timeout=timeout)
+    target = max(2, round(density * size * size))
+
+    for _ in range(attempts):
+        layout = _Layout.grow(size, target, rng)
+        while len(layout.values) >= 2:
+            solutions = list(islice(solver.solutions(layout.puzzle().board()), 2))
+            if solver.timed_out:
+                break
+            other = next((solution for solution in solutions if not layout.matches(solution)), None)
+            if other is None:
+                return layout.puzzle()
+            if not layout.exclude(other, rng):
+                break
+
+    raise ValueError(f"Could not generate a unique {size}x{size} puzzle in {attempts} attempts")
+
+
+def generate_puzzles(count: int, size: int, density: float = 0.2, seed: int = 2025, **kwargs) -> List[Puzzle]:
+    """Generate a reproducible corpus, the i-th puzzle only depends on the seed and i"""
+    return [generate_puzzle(size, density, seed=seed * 1_000_003 + i, **kwargs) for i in range(count)]
+
+
+Cell = Tuple[int, int]
+DIRECTIONS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
+
+class _Layout:
+    """The islands of a puzzle being generated, together with the bridges they were drawn from"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values: Dict[Cell, int] = {}
+        self.bridges: Dict[Tuple[Cell, Cell], int] = {}
+        # Cells covered by a bridge, no island may be placed there and no other bridge may cross them
+        self.covered: Dict[Cell, Tuple[Cell, Cell]] = {}
+
+    @staticmethod
+    def grow(size: int, target: int, rng: random.Random) -> "_Layout":
+        layout = _Layout(size)
+        start = (rng.randrange(size), rng.randrange(size))
+        layout.values[start] = 0
+        islands = [start]
+
+        for _ in range(target * 50):
+            if len(islands) >= target:
+                break
+            row, col = rng.choice(islands)
+            dr, dc = rng.choice(DIRECTIONS)
+            length = rng.randint(2, max(2, size // 3))
+
+            path = [(row + dr * step, col + dc * step) for step in range(1, length + 1)]
+            if any(not layout.inside(cell) or cell in layout.values or cell in layout.covered for cell in path):
+                continue
+            # Islands next to each other would allow a bridge the generator did not plan
+            if not layout.free(path[-1]):
+                continue
+
+            layout.connect((row, col), path[-1], rng.choice((1, 2)))
+            islands.append(path[-1])
+
+        return layout
+
+    def puzzle(self) -> Puzzle:
+        return Puzzle(self.size, tuple(sorted((row, col, value) for (row, col), value in self.values.items())))
+
+    def inside(self, cell: Cell) -> bool:
+        return 0 <= cell[0] < self.size and 0 <= cell[1] < self.size
+
+    def free(self, cell: Cell, *neighbours: Cell) -> bool:
+        """Whether a new island fits on a cell, only the given islands may be next to it"""
+        row, col = cell
+        return (self.inside(cell) and cell not in self.values and cell not in self.covered
+                and all((row + dr, col + dc) not in self.values or (row + dr, col + dc) in neighbours
+                        for dr, dc in DIRECTIONS))
+
+    def connect(self, a: Cell, b: Cell, count: int):
+        key = (min(a, b), max(a, b))
+        self.bridges[key] = count
+        self.covered.update((cell, key) for cell in _between(a, b))
+        for cell in (a, b):
+            self.values[cell] = self.values.get(cell, 0) + count
+
+    def disconnect(self, a: Cell, b: Cell) -> int:
+        count = self.bridges.pop((min(a, b), max(a, b)))
+        for cell in _between(a, b):
+            del self.covered[cell]
+        self.values[a] -= count
+        self.values[b] -= count
+        return count
+
+    def matches(self, solution: Dict[Tuple[Island, Island], int]) -> bool:
+        """Whether a solution of the puzzle is the one it was drawn from"""
+        return all(count == self.bridges.get(_key(island1, island2), 0)
+                   for (island1, island2), count in solution.items())
+
+    def exclude(self, solution: Dict[Tuple[Island, Island], int], rng: random.Random) -> bool:
+        """Add an island that rules out another solution, returns False if none fits"""
+        differences = [_key(island1, island2) for (island1, island2), count in solution.items()
+                       if count != self.bridges.get(_key(island1, island2), 0)]
+        rng.shuffle(differences)
+
+        for a, b in differences:
+            if (a, b) in self.bridges:
+                if self.split(a, b, rng):
+                    return True
+            elif self.block(a, b, rng):
+                return True
+        return False
+
+    def block(self, a: Cell, b: Cell, rng: random.Random) -> bool:
+        """Place an island between two islands without a drawn bridge, bridged to one of them"""
+        candidates = []
+        for end, cells in ((a, _between(a, b)), (b, _between(b, a))):
+            for cell in cells:
+                # The bridge to the new island may not cross a drawn one
+                if cell in self.covered:
+                    break
+                if self.free(cell, end):
+                    candidates.append((cell, end))
+        if not candidates:
+            return False
+
+        cell, end = rng.choice(candidates)
+        self.connect(cell, end, rng.choice((1, 2)))
+        return True
+
+    def split(self, a: Cell, b: Cell, rng: random.Random) -> bool:
+        """Place an island in the middle of a drawn bridge, which keeps its count on both halves"""
+        count = self.disconnect(a, b)
+        candidates = [cell for cell in _between(a, b) if self.free(cell, a, b)]
+        if not candidates:
+            self.connect(a, b, count)
+            return False
+
+        cell = rng.choice(candidates)
+        self.connect(a, cell, count)
+        self.connect(cell, b, count)
+        return True
+
+
+def _between(a: Cell, b: Cell) -> List[Cell]:
+    """The cells strictly between two cells of the same row or column, starting next to the first"""
+    dr, dc = (b[0] > a[0]) - (b[0] < a[0]), (b[1] > a[1]) - (b[1] < a[1])
+    steps = abs(b[0] - a[0]) + abs(b[1] - a[1])
+    return [(a[0] + dr * step, a[1] + dc * step) for step in range(1, steps)]
+
+
+def _key(island1: Island, island2: Island) -> Tuple[Cell, Cell]:
+    return tuple(sorted(((island1.row, island1.col), (island2.row, island2.col))))  # type: ignore[return-value]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a corpus of uniquely solvable Hashiwokakero puzzles.")
+    parser.add_argument("path", type=Path, help="the file to write the puzzles to")
+    parser.add_argument("--count", type=int, default=20, help="number of puzzles")
+    parser.add_argument("--size", type=int, default=25, help="width and height of the grid")
+    parser.add_argument("--density", type=float, default=0.2, help="islands per cell")
+    parser.add_argument("--seed", type=int, default=2025, help="seed of the corpus")
+    arguments = parser.parse_args()
+
+    puzzles = generate_puzzles(arguments.count, arguments.size, arguments.density, arguments.seed)
+    save_puzzles(arguments.path, puzzles, comment=f"{arguments.count} puzzles, size {arguments.size}, "
+                                                  f"density {arguments.density}, seed {arguments.seed}")
+    print(f"Wrote {len(puzzles)} puzzles to '{arguments.path}'.")
@@ -0,0 +1,323 @@
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from .types import HashiwokakeroBoard, Island
+
+# Domains are bitmasks over the possible bridge counts 0, 1 and 2
+ZERO, ONE, TWO = 1, 2, 4
+MIN_VALUE = (0, 0, 1, 0, 2, 0, 1, 0)
+MAX_VALUE = (0, 0, 1, 1, 2, 2, 2, 2)
+DOMAIN_SIZE = (0, 1, 1, 2, 1, 2, 2, 3)
+VALUES_DESCENDING = tuple(tuple(value for value in (2, 1, 0) if mask >> value & 1) for mask in range(8))
+
+# Trail entries for undoing changes when backtracking
+_DOMAIN, _UNION = 0, 1
+
+# Kinds of solver events
+ASSIGN, BACKTRACK, SOLUTION = "assign", "backtrack", "solution"
+
+
+@dataclass
+class SolverStats:
+    """Counters of a single solver run"""
+    nodes: int = 0
+    backtracks: int = 0
+    propagations: int = 0
+    seconds: float = 0.0
+
+
+@dataclass(frozen=True)
+class SolverEvent:
+    """Progress report of a running solver, the counters are the totals so far"""
+    kind: str
+    """ASSIGN, BACKTRACK or SOLUTION"""
+    depth: int
+    """Number of decisions on the search stack, including an assignment"""
+    connection: Optional[Tuple[Island, Island]] = None
+    """The connection that was assigned"""
+    value: Optional[int] = None
+    """The bridge count that was assigned"""
+    nodes: int = 0
+    backtracks: int = 0
+    propagations: int = 0
+    seconds: float = 0.0
+
+
+SolverListener = Callable[[SolverEvent], None]
+
+
+def value_mask(low: int, high: int) -> int:
+    """Domain mask of all bridge counts between low and high"""
+    return sum(1 << value for value in range(max(low, 0), min(high, 2) + 1))
+
+
+class HashiwokakeroSolver:
+    """
+    Constraint propagation solver.
+
+    Every potential connection is a variable with a bitmask domain over 0, 1 and 2 bridges. After every
+    decision the island sums are made arc consistent, crossing connections are excluded and components
+    of certain bridges are tracked with a union-find that is undone on backtracking. A component whose
+    islands can not take any more bridges must contain all islands, otherwise the branch is cut.
+    """
+
+    def __init__(self, timeout: float = 60.0, listener: Optional[SolverListener] = None):
+        """The listener is called from the solving thread for every assignment, backtrack and solution"""
+        self.timeout = timeout
+        self.listener = listener
+        self.stats = SolverStats()
+        self.timed_out = False
+        self.cancelled = False
+        self._search: Optional[_Search] = None
+
+    def cancel(self):
+        """Stop a running search as soon as possible, may be called from another thread"""
+        self.cancelled = True
+        search = self._search
+        if search is not None:
+            search.cancelled = True
+
+    def __call__(self, board: HashiwokakeroBoard) -> bool:
+        """Solve the board and apply the solution, returns whether a solution was found"""
+        solution = self.find_solution(board)
+        if solution is None:
+            return False
+
+        board.clear_bridges()
+        for (island1, island2), count in solution.items():
+            if count > 0:
+                board.add_bridge(island1, island2, count)
+        return True
+
+    def find_solution(self, board: HashiwokakeroBoard) -> Optional[Dict[Tuple[Island, Island], int]]:
+        """Find a solution without changing the board, returns the bridge count of every potential connection"""
+        return next(self.solutions(board), None)
+
+    def count_solutions(self, board: HashiwokakeroBoard, limit: int = 2) -> int:
+        """Count the solutions of a board, stops after `limit` solutions"""
+        count = 0
+        for _ in self.solutions(board):
+            count += 1
+            if count >= limit:
+                break
+        return count
+
+    def solutions(self, board: HashiwokakeroBoard) -> Iterator[Dict[Tuple[Island, Island], int]]:
+        """Iterate over all solutions of a board"""
+        self.stats = SolverStats()
+        self.timed_out = False
+        self.cancelled = False
+        start = perf_counter()
+        search = self._search = _Search(board, self.stats, start + self.timeout, self.listener)
+        try:
+            for domains in search.run():
+                yield {connection: MIN_VALUE[domain] for connection, domain in zip(search.connections, domains)}
+        finally:
+            self.timed_out = search.timed_out
+            self.cancelled = search.cancelled
+            self.stats.seconds = perf_counter() - start
+            self._search = None
+
+
+def solve(board: HashiwokakeroBoard, timeout: float = 60.0) -> bool:
+    """Solve the board and apply the solution, returns whether a solution was found"""
+    return HashiwokakeroSolver(timeout=timeout)(board)
+
+
+class _Search:
+    """Search state, all islands and connections are addressed by their index"""
+
+    def __init__(self, board: HashiwokakeroBoard, stats: SolverStats, deadline: float,
+                 listener: Optional[SolverListener] = None):
+        self.stats = stats
+        self.deadline = deadline
+        self.timed_out = False
+        self.cancelled = False
+        self.listener = listener
+        self.start = perf_counter()
+
+        self.connections = board.find_potential_connections()
+        self.values = [island.value for island in board.islands]
+        self.ends = board.connection_pairs()
+        self.crossings = board.crossings()
+        self.island_connections = board.island_connections()
+
+        self.domains = [value_mask(0, min(self.values[a], self.values[b])) for a, b in self.ends]
+        self.low = [0] * len(self.values)
+        self.high = [sum(MAX_VALUE[self.domains[var]] for var in vars) for vars in self.island_connections]
+
+        # Union-find over certain bridges, slack is the number of bridges the component can still take
+        self.parent = list(range(len(self.values)))
+        self.size = [1] * len(self.values)
+        self.slack = list(self.values)
+
+        self.trail: List[tuple] = []
+        self.queue: List[int] = []
+        self.queued = [False] * len(self.values)
+
+    def run(self) -> Iterator[List[int]]:
+        """Depth first search, yields the domains of every solution"""
+        if not self.values:
+            yield []
+            return
+
+        for island in range(len(self.values)):
+            self.enqueue(island)
+        if not self.propagate():
+            return
+
+        stack: List[list] = []
+        while True:
+            var = self.select()
+            if var is None:
+                if self.size[self.find(0)] == len(self.values):
+                    if self.listener is not None:
+                        self.notify(SOLUTION, len(stack))
+                    yield list(self.domains)
+            else:
+                stack.append([var, VALUES_DESCENDING[self.domains[var]], 0, len(self.trail)])
+
+            while stack:
+                frame = stack[-1]
+                var, values, next_value, mark = frame
+                self.undo(mark)
+
+                if next_value >= len(values):
+                    stack.pop()
+                    self.stats.backtracks += 1
+                    if self.listener is not None:
+                        self.notify(BACKTRACK, len(stack))
+                    continue
+
+                frame[2] += 1
+                self.stats.nodes += 1
+                if self.cancelled:
+                    return
+                if perf_counter() > self.deadline:
+                    self.timed_out = True
+                    return
+                if self.listener is not None:
+                    self.notify(ASSIGN, len(stack), self.connections[var], values[next_value])
+                if self.restrict(var, 1 << values[next_value]) and self.propagate():
+                    break
+                self.clear_queue()
+            else:
+                return
+
+    def notify(self, kind: str, depth: int, connection: Optional[Tuple[Island, Island]] = None,
+               value: Optional[int] = None):
+        stats = self.stats
+        self.listener(SolverEvent(kind, depth, connection, value, stats.nodes, stats.backtracks,
+                                  stats.propagations, perf_counter() - self.start))
+
+    def select(self) -> Optional[int]:
+        """Choose the undecided connection with the fewest values, preferring the most constrained islands"""
+        best, best_key = None, None
+        for var, domain in enumerate(self.domains):
+            size = DOMAIN_SIZE[domain]
+            if size < 2:
+                continue
+            a, b = self.ends[var]
+            key = (size, -(self.open_connections(a) + self.open_connections(b)))
+            if best_key is None or key < best_key:
+                best, best_key = var, key
+        return best
+
+    def open_connections(self, island: int) -> int:
+        return sum(1 for var in self.island_connections[island] if DOMAIN_SIZE[self.domains[var]] > 1)
+
+    def enqueue(self, island: int):
+        if not self.queued[island]:
+            self.queued[island] = True
+            self.queue.append(island)
+
+    def propagate(self) -> bool:
+        """Make all island sums arc consistent"""
+        queue, queued = self.queue, self.queued
+        while queue:
+            island = queue.pop()
+            queued[island] = False
+            self.stats.propagations += 1
+
+            value, low, high = self.values[island], self.low[island], self.high[island]
+            if low > value or high < value:
+                self.clear_queue()
+                return False
+            for var in self.island_connections[island]:
+                domain = self.domains[var]
+                allowed = domain & value_mask(value - high + MAX_VALUE[domain], value - low + MIN_VALUE[domain])
+                if allowed != domain and not self.restrict(var, allowed):
+                    self.clear_queue()
+                    return False
+        return True
+
+    def clear_queue(self):
+        for island in self.queue:
+            self.queued[island] = False
+        self.queue.clear()
+
+    def restrict(self, var: int, domain: int) -> bool:
+        """Narrow the domain of a connection, returns False on a contradiction"""
+        domain &= self.domains[var]
+        old = self.domains[var]
+        if domain == old:
+            return True
+        if not domain:
+            return False
+
+        self.trail.append((_DOMAIN, var, old))
+        self.domains[var] = domain
+        a, b = self.ends[var]
+        low_delta = MIN_VALUE[domain] - MIN_VALUE[old]
+        high_delta = MAX_VALUE[domain] - MAX_VALUE[old]
+        for island in (a, b):
+            self.low[island] += low_delta
+            self.high[island] += high_delta
+            self.slack[self.find(island)] -= low_delta
+            self.enqueue(island)
+
+        if not domain & ZERO:
+            if old & ZERO:
+                self.union(a, b)
+                for other in self.crossings[var]:
+                    if not self.restrict(other, ZERO):
+                        return False
+            root = self.find(a)
+            if self.slack[root] == 0 and self.size[root] < len(self.values):
+                return False
+        return True
+
+    def find(self, island: int) -> int:
+        while self.parent[island] != island:
+            island = self.parent[island]
+        return island
+
+    def union(self, a: int, b: int):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.trail.append((_UNION, a, b))
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        self.slack[a] += self.slack[b]
+
+    def undo(self, mark: int):
+        """Revert all changes made after the trail had the given length"""
+        trail = self.trail
+        while len(trail) > mark:
+            kind, first, second = trail.pop()
+            if kind == _UNION:
+                self.parent[second] = second
+                self.size[first] -= self.size[second]
+                self.slack[first] -= self.slack[second]
+            else:
+                domain = self.domains[first]
+                low_delta = MIN_VALUE[second] - MIN_VALUE[domain]
+                high_delta = MAX_VALUE[second] - MAX_VALUE[domain]
+                self.domains[first] = second
+                for island in self.ends[first]:
+                    self.low[island] += low_delta
+                    self.high[island] += high_delta
+                    self.slack[self.find(island)] -= low_delta
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Optional, List
+from typing import Optional, List, Iterable, ValuesView
 @dataclass(frozen=True)
 class Island:
     row: int
@@ -19,27 +19,68 @@ class Bridge:
 
 class HashiwokakeroBoard:
     size: int
-    islands: List[Island]
-    bridges: List[Bridge]
     __island_map: dict[tuple[int, int], Island]
     
     def __init__(self, islands: List[Island], bridges: Optional[List[Bridge]] = None, size: int = 6):
         self.size = size
+
+        # Bridges keyed by their ordered island pair, the bridge count of every island
+        # and a bitset of the potential connections that hold a bridge
+        self._bridges: dict[tuple[Island, Island], Bridge] = {}
+        self._degree: dict[Island, int] = {}
+        self._occupied = 0
+        self.version = 0
+        """Incremented on every change of the bridges"""
         self.islands = islands
         self.bridges = bridges if bridges is not None else []
-        self.__island_map = {(island.row, island.col):island for island in islands}
     
     @staticmethod
     def from_tuple_definition(island_data: List[tuple[int,int,int]], grid_size: int = 6):
         islands = [Island(*values) for values in island_data]
         return HashiwokakeroBoard(size=grid_size, islands=islands, bridges=[])
 
+    @property
+    def islands(self) -> List[Island]:
+        """All islands, assign a new list to change them so the cached connections are recomputed."""
+        return self._islands
+
+    @islands.setter
+    def islands(self, islands: List[Island]):
+        self._islands = islands
+        self.__island_map = {(island.row, island.col):island for island in islands}
+        self._connections: Optional[List[tuple[Island, Island]]] = None
+        self._connection_pairs: Optional[List[tuple[int, int]]] = None
+        self._island_connections: Optional[List[List[int]]] = None
+        self._connection_index: Optional[dict[tuple[Island, Island], int]] = None
+        self._crossings: Optional[List[List[int]]] = None
+        self._crossing_masks: Optional[List[int]] = None
+
+        # The bitset of occupied connections uses the connection indices
+        if self._bridges:
+            self.bridges = list(self._bridges.values())
+
     def get_island(self, row: int, col: int):
         return self.__island_map.get((row, col), None)
 
+    @property
+    def bridges(self) -> ValuesView[Bridge]:
+        """Read-only view of all bridges, use `add_bridge`, `remove_bridge` and `clear_bridges` to change them."""
+        return self._bridges.values()
+
+    @bridges.setter
+    def bridges(self, bridges: Iterable[Bridge]):
+        """Replace all bridges, without validating them."""
+        self.clear_bridges()
+        for bridge in bridges:
+            self._insert(bridge)
+
+    def get_bridge(self, island1: Island, island2: Island) -> Optional[Bridge]:
+        """Returns the bridge between both islands, if any."""
+        return self._bridges.get(self._pair_key(island1, island2))
+
     def island_bridge_count(self, island: Island):
         """Returns the number of bridges connected to the island."""
-        return sum(bridge.count for bridge in self.bridges if island in (bridge.island1, bridge.island2))
+        return self._degree.get(island, 0)
 
     def add_bridge(self, island1: Island, island2: Island, count:int):
         
@@ -49,30 +90,92 @@ class HashiwokakeroBoard:
             raise ValueError("Cannot connect an island to itself.")
         
         # Check if the islands are already connected by a bridge
-        existing_bridge = next((b for b in self.bridges if (b.island1 == island1 and b.island2 == island2) or (b.island1 == island2 and b.island2 == island1)), None)
-        if existing_bridge:
+        if self._pair_key(island1, island2) in self._bridges:
             raise ValueError(f"Bridge between {island1} and {island2} already exists.")
+
+        # Check if the new bridge would cross an existing one
+        index = self.connection_index().get((island1, island2))
+        if index is not None and self.crossing_masks()[index] & self._occupied:
+            raise ValueError(f"Bridge between {island1} and {island2} would cross an existing bridge.")
         
-        bridge = Bridge(island1, island2, count)
-        self.bridges.append(bridge)
+        self._insert(Bridge(island1, island2, count))
+
+    def remove_bridge(self, bridge: Bridge):
+        """Removes the given bridge, raises a ValueError if the board does not contain it."""
+        key = self._pair_key(bridge.island1, bridge.island2)
+        if self._bridges.get(key) != bridge:
+            raise ValueError(f"{bridge} is not on the board.")
+
+        del self._bridges[key]
+        self._degree[bridge.island1] -= bridge.count
+        self._degree[bridge.island2] -= bridge.count
+        index = self.connection_index().get(key)
+        if index is not None:
+            self._occupied &= ~(1 << index)
+        self.version += 1
+
+    def clear_bridges(self):
+        """Removes all bridges."""
+        self._bridges = {}
+        self._degree = {}
+        self._occupied = 0
+        self.version += 1
+
+    def _insert(self, bridge: Bridge):
+        self._bridges[self._pair_key(bridge.island1, bridge.island2)] = bridge
+        self._degree[bridge.island1] = self._degree.get(bridge.island1, 0) + bridge.count
+        self._degree[bridge.island2] = self._degree.get(bridge.island2, 0) + bridge.count
+        index = self.connection_index().get((bridge.island1, bridge.island2))
+        if index is not None:
+            self._occupied |= 1 << index
+        self.version += 1
+
+    @staticmethod
+    def _pair_key(island1: Island, island2: Island) -> tuple[Island, Island]:
+        if (island1.row, island1.col) <= (island2.row, island2.col):
+            return island1, island2
+        return island2, island1
 
 
     def find_potential_connections(self):
         """Find all potential connections between islands"""
-        connections = []
-
-        # For each island, find valid connections in four directions
-        for island in self.islands:
-            # Look in all 4 directions (up, right, down, left)
-            for dx, dy in [(0, -1), (1, 0), (0, 1), (-1, 0)]:
-                # Find the next island (if any) in this direction
-                next_island = self.find_next_island(island, dx, dy)
-                if next_island:
-                    # Make sure we don't add the same connection twice
-                    if (island, next_island) not in connections and (next_island, island) not in connections:
-                        connections.append((island, next_island))
-
-        return connections
+        islands = self.islands
+        return [(islands[a], islands[b]) for a, b in self.connection_pairs()]
+
+    def connection_pairs(self) -> List[tuple[int, int]]:
+        """The potential connections as pairs of island indices, in the order of `find_potential_connections`.
+        Cached until the islands change."""
+        if self._connection_pairs is None:
+            islands = self.islands
+            # Index of the next island up, right, down and left of every island, -1 if there is none
+            neighbours = [[-1, -1, -1, -1] for _ in islands]
+
+            # Islands sorted by column and then row are next to each other if they share the column,
+            # likewise for rows
+            by_col = sorted(range(len(islands)), key=lambda i: (islands[i].col, islands[i].row))
+            for upper, lower in zip(by_col, by_col[1:]):
+                if islands[upper].col == islands[lower].col:
+                    neighbours[lower][0] = upper
+                    neighbours[upper][2] = lower
+
+            by_row = sorted(range(len(islands)), key=lambda i: (islands[i].row, islands[i].col))
+            for left, right in zip(by_row, by_row[1:]):
+                if islands[left].row == islands[right].row:
+                    neighbours[left][1] = right
+                    neighbours[right][3] = left
+
+            # Every connection is added by the island that comes first
+            self._connection_pairs = [(i, j) for i, around in enumerate(neighbours) for j in around if j > i]
+        return self._connection_pairs
+
+    def island_connections(self) -> List[List[int]]:
+        """For every island, the indices of its potential connections. Cached until the islands change."""
+        if self._island_connections is None:
+            self._island_connections = [[] for _ in self.islands]
+            for index, (a, b) in enumerate(self.connection_pairs()):
+                self._island_connections[a].append(index)
+                self._island_connections[b].append(index)
+        return self._island_connections
 
     def find_next_island(self, start_island: Island, dx: int, dy: int):
         """Find the next island (if any) in the specified direction"""
@@ -94,3 +197,48 @@ class HashiwokakeroBoard:
             col += dx
 
         return None
+
+    def connection_index(self) -> dict[tuple[Island, Island], int]:
+        """Maps both orientations of every potential connection to its index in `find_potential_connections`"""
+        if self._connection_index is None:
+            self._connection_index = {}
+            for index, (island1, island2) in enumerate(self._potential_connections()):
+                self._connection_index[(island1, island2)] = index
+                self._connection_index[(island2, island1)] = index
+        return self._connection_index
+
+    def crossings(self) -> List[List[int]]:
+        """For every potential connection, the indices of the potential connections crossing it.
+        Cached until the islands change."""
+        if self._crossings is None:
+            connections = self._potential_connections()
+            self._crossings = [[] for _ in connections]
+
+            # Bucket vertical connections by column, so each horizontal one only checks the columns it spans
+            vertical_by_col: dict[int, List[int]] = {}
+            for index, (island1, island2) in enumerate(connections):
+                if island1.col == island2.col:
+                    vertical_by_col.setdefault(island1.col, []).append(index)
+
+            for h, (island1, island2) in enumerate(connections):
+                if island1.row != island2.row:
+                    continue
+                row = island1.row
+                for col in range(min(island1.col, island2.col) + 1, max(island1.col, island2.col)):
+                    for v in vertical_by_col.get(col, ()):
+                        top, bottom = connections[v]
+                        if min(top.row, bottom.row) < row < max(top.row, bottom.row):
+                            self._crossings[h].append(v)
+                            self._crossings[v].append(h)
+        return self._crossings
+
+    def crossing_masks(self) -> List[int]:
+        """Like `crossings`, but every entry is a bitset where bit i marks a crossing with connection i"""
+        if self._crossing_masks is None:
+            self._crossing_masks = [sum(1 << other for other in crossing) for crossing in self.crossings()]
+        return self._crossing_masks
+
+    def _potential_connections(self) -> List[tuple[Island, Island]]:
+        if self._connections is None:
+            self._connections = self.find_potential_connections()
+        return self._connections
@@ -0,0 +1,57 @@
+"""Run the benchmarks, optionally store the results and compare them with a baseline."""
+
+import argparse
+import fnmatch
+import sys
+from pathlib import Path
+from .harness import REPEAT, TOLERANCE, compare, load_results, measure, save_results
+from .suites import BENCHMARKS
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("patterns", nargs="*", help="only run benchmarks matching these patterns, e.g. 'connect4.*'")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timed calls per benchmark")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed calls before timing")
+    parser.add_argument("--output", type=Path, help="write the results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="compare with results written by an earlier --output")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed slowdown against the baseline")
+    parser.add_argument("--profile", type=Path, help="write a cProfile dump of every benchmark into this directory")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    arguments = parser.parse_args()
+
+    selected = [
+        benchmark for benchmark in BENCHMARKS
+        if not arguments.patterns or any(fnmatch.fnmatch(benchmark.name, pattern) for pattern in arguments.patterns)
+    ]
+
+    if arguments.list:
+        print("\n".join(benchmark.name for benchmark in selected))
+        return 0
+
+    measurements = []
+
+    for benchmark in selected:
+        measurements.append(measure(benchmark, arguments.repeat, arguments.warmup, arguments.profile))
+        print(measurements[-1].summary(), flush=True)
+
+    if arguments.output is not None:
+        save_results(arguments.output, measurements)
+
+    if arguments.baseline is None:
+        return 0
+
+    regressions = 0
+
+    print()
+
+    for comparison in compare(measurements, load_results(arguments.baseline)):
+        regressed = comparison.regressed(arguments.tolerance)
+        regressions += regressed
+        print(f"{comparison.name:<40} {comparison.ratio:6.2f}x baseline{'  REGRESSION' if regressed else ''}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
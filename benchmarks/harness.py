@@ -0,0 +1,187 @@
+"""Timing, memory and profiling of benchmarks, and comparison against a stored baseline."""
+
+from __future__ import annotations
+import cProfile
+import gc
+import json
+import platform
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, Optional
+
+TOLERANCE = 0.3
+"""How much slower than its baseline a benchmark may get before it counts as regression, shared machines may need more."""
+
+REPEAT = 10
+"""Timed calls per benchmark."""
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """
+    A piece of code to time.
+
+    ``setup`` prepares everything the benchmark needs and returns the callable to time, so
+    loading data is never part of the timings. That callable returns the number of operations
+    it did, e.g. the number of discs dropped, so timings can be reported per operation.
+    """
+
+    name: str
+    setup: Callable[[], Callable[[], int]]
+
+
+@dataclass(frozen=True)
+class Measurement:
+    """The timings of one benchmark."""
+
+    name: str
+    operations: int
+    warmup: int
+    seconds: List[float]
+    """The duration of every timed call."""
+    peak_bytes: int
+    """The peak of memory allocated during one extra call, measured with tracemalloc."""
+
+    @property
+    def median(self) -> float:
+        return median(self.seconds)
+
+    @property
+    def best(self) -> float:
+        return min(self.seconds)
+
+    @property
+    def per_operation(self) -> float:
+        """The median seconds of a single operation."""
+        return self.median / self.operations
+
+    @property
+    def best_per_operation(self) -> float:
+        """The seconds of a single operation in the fastest call, the least noisy value to compare."""
+        return self.best / self.operations
+
+    def summary(self) -> str:
+        return (
+            f"{self.name:<40} median {self.median * 1000:9.3f}ms  best {self.best * 1000:9.3f}ms  "
+            f"per op {self.per_operation * 1e6:10.2f}us  peak {self.peak_bytes / 1024:9.1f}KiB"
+        )
+
+
+@dataclass(frozen=True)
+class Comparison:
+    """A measurement next to its baseline."""
+
+    name: str
+    baseline: float
+    current: float
+    """The fastest seconds per operation of the baseline and the current measurement."""
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+    def regressed(self, tolerance: float = TOLERANCE) -> bool:
+        """
+        Check whether the benchmark got slower than allowed.
+
+        :param tolerance: The allowed slowdown, 0.3 accepts up to 30% more time.
+        :returns regressed: If the current time exceeds the baseline by more than the tolerance.
+        """
+        return self.ratio > 1 + tolerance
+
+
+def measure(benchmark: Benchmark, repeat: int = REPEAT, warmup: int = 1, profile_dir: Optional[Path] = None) -> Measurement:
+    """
+    Run a benchmark.
+
+    The warm-up calls fill caches and are not timed. Garbage collection is disabled while timing,
+    memory is measured in a separate call since tracemalloc slows down allocations.
+
+    :param benchmark: The benchmark to run.
+    :param repeat: The number of timed calls.
+    :param warmup: The number of calls before timing.
+    :param profile_dir: Where to write a cProfile dump of one extra call, named after the benchmark.
+    :returns measurement: The timings.
+    """
+    run = benchmark.setup()
+    operations = 1
+
+    for _ in range(warmup):
+        operations = run()
+
+    seconds = []
+    enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        for _ in range(repeat):
+            start = perf_counter()
+            operations = run()
+            seconds.append(perf_counter() - start)
+    finally:
+        if enabled:
+            gc.enable()
+
+    tracemalloc.start()
+
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    if profile_dir is not None:
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        profiler = cProfile.Profile()
+        profiler.runcall(run)
+        profiler.dump_stats(profile_dir / f"{benchmark.name}.prof")
+
+    return Measurement(benchmark.name, max(operations, 1), warmup, seconds, peak)
+
+
+def save_results(path: Path, measurements: Iterable[Measurement]) -> None:
+    """
+    Store measurements as JSON, together with the interpreter and machine they were taken on.
+
+    :param path: The file to write.
+    :param measurements: The measurements to store.
+    """
+    data = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {measurement.name: asdict(measurement) for measurement in measurements},
+    }
+    path.write_text(json.dumps(data, indent=2) + "\n")
+
+
+def load_results(path: Path) -> Dict[str, Measurement]:
+    """
+    Load measurements stored with `save_results`.
+
+    :param path: The file to read.
+    :returns measurements: The measurements by benchmark name.
+    """
+    data = json.loads(path.read_text())
+
+    return {name: Measurement(**result) for name, result in data["results"].items()}
+
+
+def compare(measurements: Iterable[Measurement], baseline: Dict[str, Measurement]) -> List[Comparison]:
+    """
+    Compare measurements with a baseline by their fastest seconds per operation.
+
+    Noise like other processes or frequency scaling only ever makes a call slower, so the
+    fastest of the repeated calls varies much less between runs than the median.
+
+    :param measurements: The current measurements.
+    :param baseline: The baseline measurements by benchmark name, benchmarks missing in it are skipped.
+    :returns comparisons: One comparison per benchmark found in both.
+    """
+    return [
+        Comparison(measurement.name, baseline[measurement.name].best_per_operation, measurement.best_per_operation)
+        for measurement in measurements
+        if measurement.name in baseline
+    ]
@@ -0,0 +1,212 @@
+"""The benchmarks of connect4, hashiwokakero and the GTFS routing, data is loaded in their setup only."""
+
+from __future__ import annotations
+import random
+from dataclasses import dataclass
+from typing import Any, Callable, FrozenSet, List
+from .harness import Benchmark
+from . import ROOT
+
+GAMES = 200
+"""Random games played by the connect4 benchmarks."""
+
+ROUTES = 50
+"""Random stop pairs routed by the a_star benchmarks, in addition to Aachen Hbf to Amsterdam Centraal."""
+
+SEED = 2025
+
+
+def _random_games() -> List[List[int]]:
+    """The moves of random connect4 games, played until a player wins or the board is full."""
+    from connect4 import BitBoard, Player
+
+    players = (Player.ai("first", None), Player.ai("second", None))
+    rng = random.Random(SEED)
+    games = []
+
+    for _ in range(GAMES):
+        board, moves = BitBoard(), []
+
+        while (valid := board.valid_moves()) and board.get_winner() is None:
+            moves.append(rng.choice(valid))
+            board = board.drop_in_column(players[len(moves) % 2], moves[-1])
+
+        games.append(moves)
+
+    return games
+
+
+def _game_state_moves() -> Callable[[], int]:
+    from connect4 import BitBoard, Player
+    from connect4.state import GameState
+
+    players = (Player.ai("first", None), Player.ai("second", None))
+    games = _random_games()
+
+    def run() -> int:
+        count = 0
+
+        for moves in games:
+            state = GameState(board=BitBoard(), players=players, current_player=0)
+
+            # GameState ends a game once a single column is left, which can be before the board is full
+            for column in moves:
+                if state.game_over:
+                    break
+
+                state = state.move(players[state.current_player], column)
+                count += 1
+
+        return count
+
+    return run
+
+
+def _positions() -> List[Any]:
+    """Every position of the random games."""
+    from connect4 import BitBoard, Player
+
+    players = (Player.ai("first", None), Player.ai("second", None))
+    positions = []
+
+    for moves in _random_games():
+        board = BitBoard()
+
+        for ply, column in enumerate(moves):
+            positions.append(board)
+            board = board.drop_in_column(players[ply % 2], column)
+
+    return positions
+
+
+def _drop_in_column() -> Callable[[], int]:
+    from connect4 import Player
+
+    player = Player.ai("first", None)
+    positions = _positions()
+
+    def run() -> int:
+        drops = 0
+
+        for board in positions:
+            for column in board.valid_moves():
+                board.drop_in_column(player, column)
+                drops += 1
+
+        return drops
+
+    return run
+
+
+def _get_winner() -> Callable[[], int]:
+    positions = _positions()
+
+    def run() -> int:
+        for board in positions:
+            board.get_winner()
+
+        return len(positions)
+
+    return run
+
+
+def _puzzles() -> List[Any]:
+    from hashiwokakero.benchmark import CORPUS
+    from hashiwokakero.puzzles import BUILTIN_PUZZLES, load_puzzles
+
+    return list(BUILTIN_PUZZLES.values()) + load_puzzles(CORPUS)
+
+
+def _board_construction() -> Callable[[], int]:
+    puzzles = _puzzles()
+
+    def run() -> int:
+        for puzzle in puzzles:
+            puzzle.board()
+
+        return len(puzzles)
+
+    return run
+
+
+def _potential_connections() -> Callable[[], int]:
+    boards = [puzzle.board() for puzzle in _puzzles()]
+
+    def run() -> int:
+        for board in boards:
+            # assigning the islands drops the cached connections
+            board.islands = board.islands
+            board.find_potential_connections()
+
+        return len(boards)
+
+    return run
+
+
+def _solve_builtin() -> Callable[[], int]:
+    from hashiwokakero.puzzles import BUILTIN_PUZZLES
+    from hashiwokakero.solver import HashiwokakeroSolver
+
+    solver = HashiwokakeroSolver()
+
+    def run() -> int:
+        for puzzle in BUILTIN_PUZZLES.values():
+            if not solver(puzzle.board()):
+                raise RuntimeError("A built-in puzzle was not solved.")
+
+        return len(BUILTIN_PUZZLES)
+
+    return run
+
+
+@dataclass(frozen=True)
+class _Connection:
+    target_stop_id: str
+    travel_minutes: float
+
+
+@dataclass(frozen=True)
+class _Stop:
+    id: str
+    name: str
+    lat: float
+    lon: float
+    connections: FrozenSet[_Connection]
+
+
+def _a_star(landmarks: bool) -> Callable[[], Callable[[], int]]:
+    """Route between random stops, with the landmark heuristic or none."""
+    def setup() -> Callable[[], int]:
+        from gtfs import StopGraph, a_star, build_landmarks, load_feed
+
+        # without the cache, which would be written into the repository
+        feed = load_feed(ROOT / "assignment_1" / "task_2_data", cache=False)
+        graph = StopGraph.from_stops(feed.to_stops(_Stop, _Connection))
+        heuristic = build_landmarks(graph) if landmarks else None
+
+        connected = [stop.id for stop in graph.stops if stop.connections]
+        rng = random.Random(SEED)
+        pairs = [("525449", "351939")] + [(rng.choice(connected), rng.choice(connected)) for _ in range(ROUTES)]
+
+        def run() -> int:
+            for start_id, goal_id in pairs:
+                a_star(graph, heuristic, start_id, goal_id)
+
+            return len(pairs)
+
+        return run
+
+    return setup
+
+
+BENCHMARKS = [
+    Benchmark("connect4.game_state_move", _game_state_moves),
+    Benchmark("connect4.drop_in_column", _drop_in_column),
+    Benchmark("connect4.get_winner", _get_winner),
+    Benchmark("hashiwokakero.board_construction", _board_construction),
+    Benchmark("hashiwokakero.find_potential_connections", _potential_connections),
+    Benchmark("hashiwokakero.solve_builtin", _solve_builtin),
+    Benchmark("routing.a_star_dijkstra", _a_star(landmarks=False)),
+    Benchmark("routing.a_star_landmarks", _a_star(landmarks=True)),
+]
+"""All benchmarks, an operation is a move, a drop, a position, a puzzle or a route."""